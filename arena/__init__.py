@@ -0,0 +1,5 @@
+"""Helpers shared by several exercises.
+
+Install the repository with "pip install -e ." so every exercise can
+import them, whichever directory it is run from.
+"""
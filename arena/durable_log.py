@@ -0,0 +1,142 @@
+"""Append-only JSON-lines event log with group commit, and atomic snapshots.
+
+Every record gets a sequence number and is buffered; buffered records are
+written and fsynced together once group_size of them are waiting, or on
+flush(). compact() writes a snapshot of the full state next to the log and
+empties the log, so a restart loads the snapshot and replays only the
+records written after it.
+"""
+import json
+import os
+
+
+class EventLog:
+    """Sequence-numbered JSON records appended to one file"""
+
+    def __init__(self, path, group_size=64):
+        self.path = path
+        self.group_size = group_size
+        self.seq = 0
+        # Records logged since the last snapshot, for deciding when to compact
+        self.since_snapshot = 0
+        self._pending = []
+        self._file = None
+
+    def replay(self, snapshot_seq, apply):
+        """Call apply(record) for every record newer than the snapshot, then open for appending"""
+        self.seq = snapshot_seq
+        if os.path.exists(self.path):
+            good_length = 0
+            with open(self.path, "rb") as log:
+                for line in log:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    good_length += len(line)
+                    if record["seq"] <= self.seq:
+                        continue  # already part of the snapshot
+                    apply(record)
+                    self.seq = record["seq"]
+                    self.since_snapshot += 1
+
+            # A crash mid-write can leave half a line behind; cut it off so
+            # new records are not appended to garbage
+            if good_length != os.path.getsize(self.path):
+                os.truncate(self.path, good_length)
+        self._file = open(self.path, "ab")
+
+    def append(self, record):
+        """Number and buffer a record, writing the buffer once a group is full"""
+        self.seq += 1
+        record["seq"] = self.seq
+        self._pending.append(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+        self.since_snapshot += 1
+        if len(self._pending) >= self.group_size:
+            self.flush()
+        return self.seq
+
+    def retract(self):
+        """Take back the record append() just buffered, e.g. after its group write failed"""
+        self._pending.pop()
+        self.seq -= 1
+        self.since_snapshot -= 1
+
+    def flush(self):
+        """Write and fsync every buffered record with one disk sync"""
+        data, count = self.pending()
+        self.write(data)
+        self.discard(count)
+
+    def pending(self):
+        """(encoded records, how many) of the buffer, ready for write()"""
+        return b"".join(self._pending), len(self._pending)
+
+    def discard(self, count):
+        """Drop the first count buffered records once write() has stored them"""
+        del self._pending[:count]
+
+    def write(self, data):
+        """Append already-encoded records and fsync them.
+
+        Split from flush() so a caller can read the buffer on one thread
+        and pay for the disk sync on another. If the write fails, any part
+        of it that reached the file is cut off again, so the same records
+        can be written later without leaving a torn line in between.
+        """
+        if not data:
+            return
+        position = self._file.tell()
+        try:
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            os.truncate(self.path, position)
+            self._file = open(self.path, "ab")
+            raise
+
+    def compact(self, snapshot_path, write_snapshot):
+        """Replace the snapshot with write_snapshot(file, seq)'s output and empty the log"""
+        self.flush()
+        write_atomically(snapshot_path, lambda f: write_snapshot(f, self.seq))
+
+        # Records up to self.seq are in the snapshot now, and the rename is
+        # on disk. If we crash before the truncate below, replay skips them
+        # by sequence number.
+        self._file.truncate(0)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.since_snapshot = 0
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+def write_atomically(path, write):
+    """Replace path with the bytes write(file) writes; durable once this returns"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    sync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def sync_directory(directory):
+    """Make a rename inside directory survive a crash"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return  # not supported on Windows; the rename is still atomic
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
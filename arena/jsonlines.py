@@ -0,0 +1,67 @@
+"""JSON-lines request/reply protocol over TCP, for the exercise services.
+
+Every request is one JSON object on its own line and gets one JSON line
+back. serve_lines() runs the server side of one connection;
+send_request(), run_clients() and print_latencies() are the pieces the
+bench commands drive a running service with.
+"""
+import asyncio
+import json
+import time
+
+INVALID_REQUEST = {"ok": False, "error": "Requests must be JSON objects, one per line."}
+
+
+def encode(message):
+    return json.dumps(message).encode("utf-8") + b"\n"
+
+
+async def serve_lines(reader, writer, handle):
+    """Reply to every request line of one connection with await handle(request)"""
+    try:
+        while line := await reader.readline():
+            try:
+                request = json.loads(line)
+            except ValueError:
+                request = None
+            reply = await handle(request) if isinstance(request, dict) else INVALID_REQUEST
+            writer.write(encode(reply))
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def send_request(reader, writer, message):
+    """Send one request and wait for its reply"""
+    writer.write(encode(message))
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def run_clients(count, client):
+    """Run count client(latencies) coroutines at once.
+
+    Each client appends the seconds every request took to latencies.
+    Returns (sorted latencies, elapsed seconds, every client's result).
+    """
+    latencies = []
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client(latencies) for _ in range(count)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return latencies, elapsed, results
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def print_latencies(sorted_latencies):
+    for percent in (50, 90, 99):
+        print(f"p{percent}: {percentile(sorted_latencies, percent) * 1000:.2f} ms")
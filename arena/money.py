@@ -0,0 +1,106 @@
+"""Integer-cents money helpers shared by the inventory and budget exercises.
+
+Amounts are kept as whole cents in Python ints (or typed arrays of them),
+so adding up millions of values is exact and never drifts the way binary
+floats do. Formatting works on the integer directly and gives the same
+text as the "${amount:,.2f}" formatting used throughout the exercises.
+
+Run "python -m arena.money --bench N" to compare adding up N amounts as floats
+and as integer cents.
+"""
+import argparse
+import random
+import time
+from array import array
+from decimal import ROUND_HALF_EVEN, Decimal
+from operator import mul
+
+try:
+    import numpy as np
+except ImportError:  # the builtin sum/map path gives the same results
+    np = None
+
+CENT = Decimal("0.01")
+
+
+class Money(int):
+    """A whole number of cents that prints as dollars"""
+
+    __slots__ = ()
+
+    def __str__(self):
+        return format_cents(self)
+
+    def __repr__(self):
+        return f"Money({format_cents(self)!r})"
+
+    def __format__(self, spec):
+        return format_cents(self) if not spec else format(self / 100, spec)
+
+
+def to_cents(amount):
+    """Dollar amount as integer cents.
+
+    The exact value is rounded to the cent, half cents to even, which is
+    how "{:.2f}" rounds a float too, so a price shows the same before and
+    after conversion. Strings and Decimals convert exactly.
+    """
+    if isinstance(amount, int):
+        return amount * 100
+    # Decimal(float) is the float's exact binary value; amount * 100 would
+    # round once in binary before the rounding to cents
+    return int(Decimal(amount).quantize(CENT, rounding=ROUND_HALF_EVEN) * 100)
+
+
+def format_cents(cents):
+    """Format integer cents like f"${dollars:,.2f}" formats dollars"""
+    sign = "-" if cents < 0 else ""
+    whole, fraction = divmod(abs(cents), 100)
+    return f"${sign}{whole:,}.{fraction:02d}"
+
+
+def sum_cents(values):
+    """Exact total of integer cents, using NumPy for typed arrays when available"""
+    if np is not None and getattr(values, "typecode", None) == "q":
+        return int(np.frombuffer(values, dtype=np.int64).sum())
+    return sum(values)
+
+
+def dot_cents(prices, quantities):
+    """Exact sum of price * quantity over two columns, e.g. an inventory valuation"""
+    if np is not None and getattr(prices, "typecode", None) == "q" and hasattr(quantities, "typecode"):
+        prices = np.frombuffer(prices, dtype=np.int64)
+        quantities = np.frombuffer(quantities, dtype=np.dtype(quantities.typecode)).astype(np.int64)
+        return int(prices @ quantities)
+    # map(mul) keeps the multiply loop in C; Python ints never overflow
+    return sum(map(mul, prices, quantities))
+
+
+def bench(count):
+    cents = array('q', (random.randint(1, 1_000_000) for _ in range(count)))
+    floats = [value / 100 for value in cents]
+
+    start = time.perf_counter()
+    float_total = 0.0
+    for amount in floats:
+        float_total += amount
+    float_text = f"${float_total:,.2f}"
+    float_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cents_total = sum_cents(cents)
+    cents_text = format_cents(cents_total)
+    cents_time = time.perf_counter() - start
+
+    exact_total = Decimal(sum(cents)) / 100
+    exact = f"${exact_total:,.2f}"
+    print(f"Amounts: {count:,}")
+    print(f"Float loop:    {float_time * 1000:.1f} ms, {float_text}, off by {float_total - float(exact_total):+.2e}")
+    print(f"Integer cents: {cents_time * 1000:.1f} ms, {cents_text} ({'NumPy' if np is not None else 'builtin sum'})")
+    print(f"Exact: {exact}; cents {'match' if cents_text == exact else 'DIFFER'}, {float_time / cents_time:.1f}x faster")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare float and integer-cents totals")
+    parser.add_argument("--bench", type=int, default=1_000_000, metavar="N", help="number of amounts")
+    bench(parser.parse_args().bench)
@@ -0,0 +1,29 @@
+"""Process pool helpers for the batch commands."""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def ordered_map(function, items, workers, initializer=None, initargs=()):
+    """Yield function(item) for every item, in order, across a process pool.
+
+    Only 2 * workers items are in flight at once, so a long or endless
+    iterable is consumed as fast as the workers keep up and memory stays
+    flat. With one worker or fewer everything runs in this process, after
+    initializer(*initargs) as each pool worker would have run it.
+    """
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for item in items:
+            yield function(item)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        # Keep every worker busy with one item queued behind it, and no more
+        in_flight = deque()
+        for item in items:
+            in_flight.append(pool.submit(function, item))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
@@ -0,0 +1,204 @@
+"""Non-interactive bulk import of grade files and streaming report export.
+
+Usage:
+    python grade_batch.py grades.csv -o report.csv
+    python grade_batch.py grades.jsonl --format jsonl -o report.jsonl
+    cat grades.csv | python grade_batch.py - > report.csv
+
+Input rows carry a student name and one grade ("name,grade" CSV with a
+header, or {"name": ..., "grade": ...} JSON lines). Rows are read one at a
+time, so memory grows with the number of students, never with the number
+of grade rows.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+
+from grade_book import determine_letter_grade, is_valid_grade
+
+
+def detect_format(path, default="csv"):
+    """Guess the file format from its extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if extension == ".csv":
+        return "csv"
+    return default
+
+
+def read_grade_rows(stream, fmt):
+    """Yield (line_number, name, raw_grade) for every row of a grade file"""
+    if fmt == "jsonl":
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                yield line_number, record.get("name"), record.get("grade")
+            except (ValueError, AttributeError):
+                yield line_number, None, None
+    else:
+        reader = csv.reader(stream)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = [column.strip().lower() for column in header]
+        try:
+            name_column, grade_column = columns.index("name"), columns.index("grade")
+        except ValueError:
+            # No header: the first line is already a name,grade row
+            name_column, grade_column = 0, 1
+            yield 1, *_pick(header, name_column, grade_column)
+        for row in reader:
+            yield reader.line_num, *_pick(row, name_column, grade_column)
+
+
+def _pick(row, name_column, grade_column):
+    if len(row) <= max(name_column, grade_column):
+        return None, None
+    return row[name_column], row[grade_column]
+
+
+def validate_grades(rows, on_error):
+    """Yield (name, grade) for valid rows and report the others to on_error"""
+    for line_number, name, raw_grade in rows:
+        name = name.strip() if isinstance(name, str) else None
+        if not name:
+            on_error(line_number, "Invalid row! Expected a student name and a grade.")
+            continue
+        try:
+            grade = float(raw_grade)
+        except (TypeError, ValueError):
+            on_error(line_number, "Invalid grade! Please enter a number.")
+            continue
+        if math.isnan(grade) or not is_valid_grade(grade):
+            on_error(line_number, "Grade must be between 0 and 100!")
+            continue
+        yield name, grade
+
+
+def accumulate(grades):
+    """Fold (name, grade) pairs into {name: [sum, count]} in arrival order"""
+    totals = {}
+    for name, grade in grades:
+        entry = totals.get(name)
+        if entry is None:
+            totals[name] = [grade, 1]
+        else:
+            entry[0] += grade
+            entry[1] += 1
+    return totals
+
+
+def student_reports(totals):
+    """Yield (name, count, average, letter) for every student"""
+    for name, (total, count) in totals.items():
+        average = total / count
+        yield name, count, average, determine_letter_grade(average)
+
+
+def class_statistics(totals):
+    """Class average plus highest and lowest students, in a single pass"""
+    average_total = 0.0
+    highest = lowest = None
+    for name, (total, count) in totals.items():
+        average = total / count
+        average_total += average
+        # Strict > keeps the first student on ties, >= keeps the last,
+        # matching the ordering display_class_statistics always used
+        if highest is None or average > highest[1]:
+            highest = (name, average)
+        if lowest is None or average <= lowest[1]:
+            lowest = (name, average)
+    if not totals:
+        return None
+    return {
+        "students": len(totals),
+        "class_average": average_total / len(totals),
+        "highest": highest,
+        "lowest": lowest,
+    }
+
+
+def write_reports(reports, stream, fmt):
+    """Stream per-student report rows to an open text file"""
+    if fmt == "jsonl":
+        for name, count, average, letter in reports:
+            stream.write(json.dumps({
+                "name": name,
+                "grades": count,
+                "average": round(average, 2),
+                "letter_grade": letter,
+            }) + "\n")
+    else:
+        writer = csv.writer(stream)
+        writer.writerow(["name", "grades", "average", "letter_grade"])
+        for name, count, average, letter in reports:
+            writer.writerow([name, count, f"{average:.2f}", letter])
+
+
+def print_class_statistics(stats, stream):
+    if stats is None:
+        print("No grades recorded for any student!", file=stream)
+        return
+    highest_student, highest_avg = stats["highest"]
+    lowest_student, lowest_avg = stats["lowest"]
+    print("\nClass Statistics:", file=stream)
+    print(f"Students: {stats['students']}", file=stream)
+    print(f"Class Average: {stats['class_average']:.2f}", file=stream)
+    print(f"Highest Performing Student: {highest_student} ({highest_avg:.2f})", file=stream)
+    print(f"Lowest Performing Student: {lowest_student} ({lowest_avg:.2f})", file=stream)
+
+
+def _open(path, mode):
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import grades and export student reports")
+    parser.add_argument("input", help="grade file (CSV or JSONL), or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="report file, or - for stdout")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="input format (default: from extension)")
+    parser.add_argument("--report-format", choices=["csv", "jsonl"], help="report format (default: from extension)")
+    parser.add_argument("--errors", help="write rejected rows here instead of stderr")
+    args = parser.parse_args(argv)
+
+    in_format = args.format or detect_format(args.input)
+    out_format = args.report_format or detect_format(args.output)
+    rejected = 0
+    error_stream = _open(args.errors, "w") if args.errors else sys.stderr
+
+    def on_error(line_number, message):
+        nonlocal rejected
+        rejected += 1
+        print(f"line {line_number}: {message}", file=error_stream)
+
+    source = _open(args.input, "r")
+    try:
+        totals = accumulate(validate_grades(read_grade_rows(source, in_format), on_error))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    output = _open(args.output, "w")
+    try:
+        write_reports(student_reports(totals), output, out_format)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print_class_statistics(class_statistics(totals), sys.stderr)
+    print(f"Rejected rows: {rejected}", file=sys.stderr)
+    if error_stream is not sys.stderr:
+        error_stream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,18 @@
+import argparse
+import bisect
+
+# Student averages are added to the class total as integers in units of
+# 2 ** -64, the same idea as the integer cents of arena.money; scaling a
+# float by a power of two is exact.
+AVERAGE_SCALE = 1 << 64
 
 
 def calculate_average(grades):
     return sum(grades) / len(grades) if grades else 0
 
+def is_valid_grade(grade):
+    return 0 <= grade <= 100
+
 def determine_letter_grade(average):
     if average >= 90:
         return 'A'
@@ -15,12 +25,122 @@ def determine_letter_grade(average):
     else:
         return 'F'
 
+class Gradebook:
+    """Gradebook that keeps running totals so statistics never rescan the class"""
+
+    def __init__(self):
+        self.grades = {}
+        self._sums = {}
+        self._order = {}
+        # Sorted (average, -order, name) for every student with grades. The
+        # negated insertion order reproduces the tie-breaking of the old
+        # stable sort: earliest student wins the top, latest the bottom.
+        # An update finds its slot in O(log n) comparisons, but inserting
+        # into and deleting from the list still shifts O(n) pointers; that
+        # shift is a single memmove, a few microseconds at 100,000 students.
+        self._ranking = []
+        self._average_total = 0
+        self._graded_count = 0
+        self._letter_counts = {letter: 0 for letter in "ABCDF"}
+
+    def __contains__(self, name):
+        return name in self.grades
+
+    def __len__(self):
+        return len(self.grades)
+
+    def add_student(self, name):
+        if name in self.grades:
+            return False
+        self._order[name] = len(self._order)
+        self.grades[name] = []
+        self._sums[name] = 0.0
+        return True
+
+    def add_grade(self, name, grade):
+        self.add_grades(name, [grade])
+
+    def add_grades(self, name, new_grades):
+        """Append several grades to one student, updating the statistics once"""
+        if not new_grades:
+            return
+        grades = self.grades[name]
+        if grades:
+            old_average = self._sums[name] / len(grades)
+            self._remove_from_ranking(name, old_average)
+            self._average_total -= int(old_average * AVERAGE_SCALE)
+            self._letter_counts[determine_letter_grade(old_average)] -= 1
+        else:
+            self._graded_count += 1
+
+        grades.extend(new_grades)
+        self._sums[name] = sum(new_grades, self._sums[name])
+        average = self._sums[name] / len(grades)
+        bisect.insort(self._ranking, (average, -self._order[name], name))
+        self._average_total += int(average * AVERAGE_SCALE)
+        self._letter_counts[determine_letter_grade(average)] += 1
+
+    def _remove_from_ranking(self, name, average):
+        index = bisect.bisect_left(self._ranking, (average, -self._order[name], name))
+        del self._ranking[index]
+
+    def average(self, name):
+        grades = self.grades[name]
+        return self._sums[name] / len(grades) if grades else 0
+
+    def class_average(self):
+        if not self._graded_count:
+            return None
+        return self._average_total / self._graded_count / AVERAGE_SCALE
+
+    def top_student(self):
+        if not self._ranking:
+            return None
+        average, _, name = self._ranking[-1]
+        return name, average
+
+    def bottom_student(self):
+        if not self._ranking:
+            return None
+        average, _, name = self._ranking[0]
+        return name, average
+
+    # The ranking is always sorted, so the queries below only slice or index it
+    def top_students(self, k):
+        if k <= 0:
+            return []
+        return [(name, average) for average, _, name in reversed(self._ranking[-k:])]
+
+    def bottom_students(self, k):
+        if k <= 0:
+            return []
+        return [(name, average) for average, _, name in self._ranking[:k]]
+
+    def percentile(self, percent):
+        """Student average at the given percentile, interpolating between ranks"""
+        if not self._ranking:
+            return None
+        if not 0 <= percent <= 100:
+            raise ValueError("Percentile must be between 0 and 100!")
+        position = (len(self._ranking) - 1) * percent / 100
+        lower = int(position)
+        upper = min(lower + 1, len(self._ranking) - 1)
+        fraction = position - lower
+        lower_avg = self._ranking[lower][0]
+        return lower_avg + (self._ranking[upper][0] - lower_avg) * fraction
+
+    def median(self):
+        return self.percentile(50)
+
+    def letter_histogram(self):
+        return dict(self._letter_counts)
+
 def add_new_student(gradebook):
     name = input("Enter student name: ")
     if name in gradebook:
         print("Student already exists!")
     else:
-        gradebook[name] = []
+        gradebook.add_student(name)
         print(f"Student {name} added successfully!")
 
 def add_grade_to_student(gradebook):
@@ -31,10 +151,10 @@ def add_grade_to_student(gradebook):
     
     try:
         grade = float(input("Enter grade to add: "))
-        if grade < 0 or grade > 100:
+        if not is_valid_grade(grade):
             print("Grade must be between 0 and 100!")
         else:
-            gradebook[name].append(grade)
+            gradebook.add_grade(name, grade)
             print(f"Grade {grade} added to {name}'s record.")
     except ValueError:
         print("Invalid grade! Please enter a number.")
@@ -45,12 +165,12 @@ def view_student_grades(gradebook):
         print("Student not found!")
         return
     
-    grades = gradebook[name]
+    grades = gradebook.grades[name]
     if not grades:
         print(f"{name} has no grades recorded.")
         return
     
-    average = calculate_average(grades)
+    average = gradebook.average(name)
     letter_grade = determine_letter_grade(average)
     
     print(f"\nStudent: {name}")
@@ -63,44 +183,71 @@ def display_class_statistics(gradebook):
         print("No students in the gradebook!")
         return
     
-    # Calculate statistics
-    class_averages = []
-    student_stats = []
-    
-    for name, grades in gradebook.items():
-        if grades:
-            avg = calculate_average(grades)
-            class_averages.append(avg)
-            student_stats.append((name, avg))
-    
-    if not class_averages:
+    # Statistics are maintained on every grade added, so nothing is rescanned here
+    class_avg = gradebook.class_average()
+    if class_avg is None:
         print("No grades recorded for any student!")
         return
     
-    class_avg = sum(class_averages) / len(class_averages)
-    
-    # Find highest and lowest performing students
-    student_stats.sort(key=lambda x: x[1], reverse=True)
-    highest_student, highest_avg = student_stats[0]
-    lowest_student, lowest_avg = student_stats[-1]
+    highest_student, highest_avg = gradebook.top_student()
+    lowest_student, lowest_avg = gradebook.bottom_student()
     
     print("\nClass Statistics:")
     print(f"Class Average: {class_avg:.2f}")
     print(f"Highest Performing Student: {highest_student} ({highest_avg:.2f})")
     print(f"Lowest Performing Student: {lowest_student} ({lowest_avg:.2f})")
 
+def display_class_rankings(gradebook, k=3):
+    if gradebook.class_average() is None:
+        print("No grades recorded for any student!")
+        return
+    
+    print("\nClass Rankings:")
+    print(f"Top {k}:")
+    for rank, (name, avg) in enumerate(gradebook.top_students(k), 1):
+        print(f"  {rank}. {name} ({avg:.2f})")
+    print(f"Bottom {k}:")
+    for rank, (name, avg) in enumerate(gradebook.bottom_students(k), 1):
+        print(f"  {rank}. {name} ({avg:.2f})")
+    
+    print(f"Median Average: {gradebook.median():.2f}")
+    print(f"25th / 75th Percentile: {gradebook.percentile(25):.2f} / {gradebook.percentile(75):.2f}")
+    
+    print("Grade Distribution:")
+    histogram = gradebook.letter_histogram()
+    largest = max(histogram.values())
+    for letter, count in histogram.items():
+        bar = '█' * round(count / largest * 20)  # Longest bar is 20 characters
+        print(f"  {letter}: {bar} {count}")
+
 def main():
-    gradebook = {}
+    parser = argparse.ArgumentParser(description="Student gradebook manager")
+    parser.add_argument("--data-dir", help="keep the gradebook in this directory between runs")
+    args = parser.parse_args()
     
+    if args.data_dir:
+        from gradebook_store import PersistentGradebook
+        gradebook = PersistentGradebook(args.data_dir)
+    else:
+        gradebook = Gradebook()
+    
+    try:
+        run_menu(gradebook)
+    finally:
+        if args.data_dir:
+            gradebook.close()
+
+def run_menu(gradebook):
     while True:
         print("\nGradebook Menu:")
         print("1. Add new student")
         print("2. Add grade to existing student")
         print("3. View student average and letter grade")
         print("4. Display class statistics")
-        print("5. Exit")
+        print("5. Display class rankings and grade distribution")
+        print("6. Exit")
         
-        choice = input("Enter your choice (1-5): ")
+        choice = input("Enter your choice (1-6): ")
         
         if choice == '1':
             add_new_student(gradebook)
@@ -111,10 +258,16 @@ def main():
         elif choice == '4':
             display_class_statistics(gradebook)
         elif choice == '5':
+            display_class_rankings(gradebook)
+        elif choice == '6':
             print("Exiting gradebook system. Goodbye!")
             break
         else:
-            print("Invalid choice! Please enter a number between 1 and 5.")
+            print("Invalid choice! Please enter a number between 1 and 6.")
+        
+        # Someone typing at the menu is slow enough to sync every change
+        if hasattr(gradebook, "flush"):
+            gradebook.flush()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,113 @@
+"""Columnar grade storage for grading a whole cohort in one batch"""
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from itertools import repeat
+
+try:
+    import numpy as np
+except ImportError:  # the pure-Python path below gives the same results
+    np = None
+
+# Lower bound of each letter band, the same cut-offs as determine_letter_grade
+LETTER_THRESHOLDS = (60, 70, 80, 90)
+LETTERS = "FDCBA"
+LETTER_TABLE = bytes.maketrans(bytes(range(len(LETTERS))), LETTERS.encode())
+
+
+class ColumnarGrades:
+    """Student names plus one flat float array of grades sliced by offsets.
+
+    The grades of student i live in grades[offsets[i]:offsets[i + 1]], so a
+    class of any size costs two arrays instead of one list object per student.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.grades = array('d')
+        self.offsets = array('q', [0])
+        self._index = {}
+
+    @classmethod
+    def from_gradebook(cls, gradebook):
+        """Build from a Gradebook or a plain {"name": [grades]} dictionary"""
+        columns = cls()
+        for name, grades in getattr(gradebook, "grades", gradebook).items():
+            columns.append_student(name, grades)
+        return columns
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def append_student(self, name, grades):
+        if name in self._index:
+            raise ValueError(f"Student {name} already exists!")
+        self._index[name] = len(self.names)
+        self.names.append(name)
+        self.grades.extend(grades)
+        self.offsets.append(len(self.grades))
+
+    def grades_for(self, name):
+        i = self._index[name]
+        return self.grades[self.offsets[i]:self.offsets[i + 1]]
+
+    def counts(self):
+        """Number of grades recorded for every student"""
+        if np is not None:
+            return np.diff(np.frombuffer(self.offsets, dtype=np.int64))
+        offsets = self.offsets
+        return array('q', map(int.__sub__, offsets[1:], offsets[:-1]))
+
+    def averages(self):
+        """Average of every student, 0 for students without grades"""
+        if np is not None:
+            grades = np.frombuffer(self.grades, dtype=np.float64)
+            starts = np.frombuffer(self.offsets, dtype=np.int64)[:-1]
+            counts = self.counts()
+            graded = counts > 0
+            averages = np.zeros(len(self.names))
+            # reduceat over the non-empty starts only: empty students would
+            # otherwise pick up the first grade of the next student
+            if graded.any():
+                averages[graded] = np.add.reduceat(grades, starts[graded]) / counts[graded]
+            return averages
+
+        grades, offsets = self.grades, self.offsets
+        return array('d', (
+            sum(grades[start:end]) / (end - start) if end > start else 0
+            for start, end in zip(offsets, offsets[1:])
+        ))
+
+    def letter_grades(self, averages=None):
+        """Letter grade of every student, bucketed in one pass over the averages"""
+        if averages is None:
+            averages = self.averages()
+        if np is not None:
+            bands = np.searchsorted(LETTER_THRESHOLDS, averages, side="right")
+            return np.array(list(LETTERS))[bands].tolist()
+        bands = bytes(map(bisect_right, repeat(LETTER_THRESHOLDS), averages))
+        return list(bands.translate(LETTER_TABLE).decode("ascii"))
+
+    def grade_distribution(self):
+        """Number of graded students in each letter band, from A down to F"""
+        averages = self.averages()
+        counts = self.counts()
+        if np is not None:
+            graded = np.asarray(averages)[counts > 0]
+            bands = np.searchsorted(LETTER_THRESHOLDS, graded, side="right")
+            totals = np.bincount(bands, minlength=len(LETTERS))
+            return {letter: int(totals[i]) for i, letter in reversed(list(enumerate(LETTERS)))}
+        graded = (average for average, count in zip(averages, counts) if count)
+        totals = Counter(map(bisect_right, repeat(LETTER_THRESHOLDS), graded))
+        return {letter: totals[i] for i, letter in reversed(list(enumerate(LETTERS)))}
+
+    def report(self):
+        """Yield (name, average, letter) for every student with grades"""
+        averages = self.averages()
+        letters = self.letter_grades(averages)
+        for name, count, average, letter in zip(self.names, self.counts(), averages, letters):
+            if count:
+                yield name, float(average), letter
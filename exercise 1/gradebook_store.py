@@ -0,0 +1,139 @@
+"""Persistent gradebook: append-only event log plus memory-mapped snapshots.
+
+A store directory holds two files:
+
+    grades.log     one JSON event per line: add-student or add-grade
+    grades.snap    compacted binary snapshot of every student and grade
+
+On open the snapshot is memory mapped and loaded in one pass, then only
+the log events written after it are replayed, so startup cost follows the
+snapshot size rather than the full history. Events are buffered and
+fsynced in groups; anything still buffered when the process dies is lost,
+everything flushed before that survives.
+"""
+import mmap
+import os
+import struct
+from array import array
+from itertools import accumulate
+
+from arena.durable_log import EventLog
+from grade_book import Gradebook
+from grade_columns import ColumnarGrades
+
+LOG_NAME = "grades.log"
+SNAPSHOT_NAME = "grades.snap"
+
+# magic, last event sequence number, students, grades, name bytes; then
+# grade offsets, grades, name offsets and the UTF-8 names back to back
+SNAPSHOT_HEADER = struct.Struct("<8sQQQQ")
+SNAPSHOT_MAGIC = b"GRDBOOK2"
+
+
+class PersistentGradebook(Gradebook):
+    """Gradebook whose changes are logged to disk and survive restarts"""
+
+    def __init__(self, directory, group_size=256, compact_every=100_000):
+        super().__init__()
+        self.directory = directory
+        self.compact_every = compact_every
+        self._snapshot_path = os.path.join(directory, SNAPSHOT_NAME)
+        self._log = EventLog(os.path.join(directory, LOG_NAME), group_size)
+
+        os.makedirs(directory, exist_ok=True)
+        self._log.replay(self._load_snapshot(), self._apply)
+
+    # Recovery
+
+    def _load_snapshot(self):
+        """Load the snapshot if there is one and return its sequence number"""
+        if not os.path.exists(self._snapshot_path) or not os.path.getsize(self._snapshot_path):
+            return 0
+
+        with open(self._snapshot_path, "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic, seq, students, grade_count, name_bytes = SNAPSHOT_HEADER.unpack_from(mapped)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{self._snapshot_path} is not a gradebook snapshot")
+
+            view = memoryview(mapped)
+            position = SNAPSHOT_HEADER.size
+            offsets = view[position:position + 8 * (students + 1)].cast("q")
+            position += 8 * (students + 1)
+            grades = view[position:position + 8 * grade_count].cast("d")
+            position += 8 * grade_count
+            # Names are sliced by offset, so any character, "\0" too, may be in one
+            name_offsets = view[position:position + 8 * (students + 1)].cast("q")
+            position += 8 * (students + 1)
+            names = bytes(view[position:position + name_bytes])
+
+            try:
+                for i in range(students):
+                    name = names[name_offsets[i]:name_offsets[i + 1]].decode("utf-8")
+                    super().add_student(name)
+                    super().add_grades(name, grades[offsets[i]:offsets[i + 1]].tolist())
+            finally:
+                # Views must be released before the map can be closed
+                offsets.release()
+                grades.release()
+                name_offsets.release()
+                view.release()
+        return seq
+
+    def _apply(self, event):
+        if event["op"] == "student":
+            super().add_student(event["name"])
+        elif event["op"] == "grade":
+            super().add_grades(event["name"], [event["grade"]])
+
+    # Writes
+
+    def add_student(self, name):
+        if not super().add_student(name):
+            return False
+        self._log.append({"op": "student", "name": name})
+        self._maybe_compact()
+        return True
+
+    def add_grades(self, name, new_grades):
+        super().add_grades(name, new_grades)
+        for grade in new_grades:
+            self._log.append({"op": "grade", "name": name, "grade": grade})
+        # Only once the whole batch is logged: a snapshot taken halfway would
+        # hold every grade but an older sequence number than the rest of the
+        # batch, which would then be replayed on top of it
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._log.since_snapshot >= self.compact_every:
+            self.snapshot()
+
+    def flush(self):
+        """Write buffered events and fsync them with a single disk sync"""
+        self._log.flush()
+
+    def snapshot(self):
+        """Compact the whole gradebook into a new snapshot and empty the log"""
+        columns = ColumnarGrades.from_gradebook(self)
+        encoded = [name.encode("utf-8") for name in columns.names]
+        name_offsets = array("q", accumulate(map(len, encoded), initial=0))
+        names = b"".join(encoded)
+
+        def write(f, seq):
+            f.write(SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, seq, len(columns), len(columns.grades), len(names)))
+            f.write(columns.offsets.tobytes())
+            f.write(columns.grades.tobytes())
+            f.write(name_offsets.tobytes())
+            f.write(names)
+
+        self._log.compact(self._snapshot_path, write)
+
+    def close(self):
+        self._log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
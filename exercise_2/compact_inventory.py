@@ -0,0 +1,211 @@
+"""Struct-of-arrays inventory for multi-million SKU catalogs.
+
+Instead of one nested dict per item, every field lives in its own typed
+array indexed by item number: prices as integer cents, stock counts, and
+category ids pointing into a table of interned category names. Names are
+found through an open-addressing table of item numbers held in an array,
+which costs a fraction of a dict entry per item.
+
+Run "python compact_inventory.py --bench N" to compare memory use and
+valuation time against the nested-dict layout used by inventory_manager.
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from array import array
+from itertools import compress
+
+from arena.money import dot_cents, format_cents, to_cents
+from inventory_manager import LOW_STOCK_THRESHOLD
+
+
+class CompactInventory:
+    """Inventory stored column by column instead of one dict per item"""
+
+    def __init__(self, low_stock_threshold=LOW_STOCK_THRESHOLD):
+        self.low_stock_threshold = low_stock_threshold
+        self.names = []
+        self.price_cents = array('q')
+        self.stock = array('i')
+        self.category_ids = array('I')
+        self.categories = []
+        self.total_value_cents = 0
+        # Item number + 1 per slot, 0 for empty; kept at most half full
+        self._slots = array('i', bytes(4 * 8))
+        self._category_index = {}
+        # Item numbers of each category, so a search costs O(matches)
+        self._members = []
+
+    @classmethod
+    def from_inventory(cls, inventory, **options):
+        """Build from an Inventory or a plain nested-dict inventory"""
+        compact = cls(**options)
+        for name, item in getattr(inventory, "data", inventory).items():
+            compact.add_item(name, item["price"], item["stock"], item["category"])
+        return compact
+
+    def _find(self, name):
+        """Slot position for name: either its entry or the empty slot it would take"""
+        slots, names = self._slots, self.names
+        mask = len(slots) - 1
+        position = hash(name) & mask
+        while True:
+            entry = slots[position]
+            if not entry or names[entry - 1] == name:
+                return position
+            position = (position + 1) & mask
+
+    def _grow(self):
+        self._slots = array('i', bytes(4 * len(self._slots) * 2))
+        for i, name in enumerate(self.names):
+            self._slots[self._find(name)] = i + 1
+
+    def index_of(self, name):
+        """Item number of name, or -1 if it is not in the inventory"""
+        return self._slots[self._find(name)] - 1
+
+    def __contains__(self, name):
+        return self.index_of(name) >= 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, name):
+        i = self.index_of(name)
+        if i < 0:
+            raise KeyError(name)
+        return self._item(i)
+
+    def _category_id(self, category):
+        category = category.title()
+        category_id = self._category_index.get(category)
+        if category_id is None:
+            category_id = self._category_index[category] = len(self.categories)
+            self.categories.append(category)
+            self._members.append(array('I'))
+        return category_id
+
+    def add_item(self, name, price, stock, category):
+        """Add a new item, returning False if it already exists"""
+        position = self._find(name)
+        if self._slots[position]:
+            return False
+        i = len(self.names)
+        self._slots[position] = i + 1
+        category_id = self._category_id(category)
+        cents = to_cents(price)
+        self.names.append(name)
+        self.price_cents.append(cents)
+        self.stock.append(stock)
+        self.category_ids.append(category_id)
+        self._members[category_id].append(i)
+        self.total_value_cents += cents * stock
+        if 2 * len(self.names) > len(self._slots):
+            self._grow()
+        return True
+
+    def _require(self, name):
+        i = self.index_of(name)
+        if i < 0:
+            raise KeyError(name)
+        return i
+
+    def add_stock(self, name, amount):
+        i = self._require(name)
+        self.stock[i] += amount
+        self.total_value_cents += self.price_cents[i] * amount
+
+    def remove_stock(self, name, amount):
+        """Remove stock, returning False if there is not enough available"""
+        i = self._require(name)
+        if self.stock[i] < amount:
+            return False
+        self.stock[i] -= amount
+        self.total_value_cents -= self.price_cents[i] * amount
+        return True
+
+    def recompute_total_cents(self):
+        """Full valuation scan in cents, for checking the running total"""
+        return dot_cents(self.price_cents, self.stock)
+
+    def low_stock_items(self):
+        """Items at or below the threshold as {name: data}, in inventory order"""
+        low = compress(range(len(self.names)), map(self.low_stock_threshold.__ge__, self.stock))
+        return {self.names[i]: self._item(i) for i in low}
+
+    def in_category(self, category):
+        """Items in a category as {name: data}"""
+        category_id = self._category_index.get(category.strip().title())
+        if category_id is None:
+            return {}
+        return {self.names[i]: self._item(i) for i in self._members[category_id]}
+
+    def _item(self, i):
+        return {
+            "price": self.price_cents[i] / 100,
+            "stock": self.stock[i],
+            "category": self.categories[self.category_ids[i]],
+        }
+
+
+def _measure(build):
+    """Return (result, bytes allocated while building it)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def _best_time(function, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench(count):
+    categories = ["Electronics", "Accessories", "Furniture", "Toys", "Books", "Garden"]
+    # Names are created up front and shared by both layouts, so the numbers
+    # below compare the per-item overhead of each layout only
+    names = [f"Sku{i:08d}" for i in range(count)]
+
+    def build_dicts():
+        return {
+            name: {"price": (i % 10_000) / 100 + 0.99, "stock": i % 50, "category": categories[i % 6]}
+            for i, name in enumerate(names)
+        }
+
+    nested, nested_bytes = _measure(build_dicts)
+    compact, compact_bytes = _measure(lambda: CompactInventory.from_inventory(nested))
+
+    def nested_value():
+        return sum(item["price"] * item["stock"] for item in nested.values())
+
+    nested_time = _best_time(nested_value)
+    scan_time = _best_time(compact.recompute_total_cents)
+    assert compact.recompute_total_cents() == compact.total_value_cents
+
+    print(f"Items: {count:,}")
+    print(f"Nested dicts: {nested_bytes / count:,.1f} bytes/item, valuation {nested_time * 1000:,.1f} ms"
+          f" ({f'${nested_value():,.2f}'})")
+    print(f"Compact:      {compact_bytes / count:,.1f} bytes/item, valuation scan {scan_time * 1000:,.1f} ms"
+          f" ({format_cents(compact.total_value_cents)}), running total O(1)")
+    print(f"Memory: {nested_bytes / compact_bytes:.1f}x smaller, valuation scan {nested_time / scan_time:.1f}x faster")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compact inventory benchmark")
+    parser.add_argument("--bench", type=int, default=1_000_000, metavar="N", help="number of items")
+    args = parser.parse_args(argv)
+    bench(args.bench)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
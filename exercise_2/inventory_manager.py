@@ -1,15 +1,153 @@
+from arena.money import Money, to_cents
+
+LOW_STOCK_THRESHOLD = 5
+
+# Direction of each stock movement type; adjustments carry their own sign
+MOVEMENT_SIGNS = {"receipt": 1, "sale": -1, "adjustment": 1}
+
+class Inventory:
+    """Inventory items plus indexes and totals kept current on every change"""
+
+    def __init__(self, items=None, low_stock_threshold=LOW_STOCK_THRESHOLD):
+        self.data = {}
+        self.low_stock_threshold = low_stock_threshold
+        # Values are kept in integer cents (see arena.money)
+        self.total_value_cents = 0
+        self._category_cents = {}
+        self._order = {}
+        # Names at or below the threshold; sorted by _order only when shown
+        self._low_stock = set()
+        # Normalized category -> {item name: None}; a dict keeps insertion
+        # order, so search results list items in the order they were added
+        self._by_category = {}
+        for name, item in (items or {}).items():
+            self.add_item(name, item["price"], item["stock"], item["category"])
+
+    def __contains__(self, name):
+        return name in self.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, name):
+        return self.data[name]
+
+    @property
+    def total_value(self):
+        """Total inventory value in dollars"""
+        return self.total_value_cents / 100
+
+    def add_item(self, name, price, stock, category):
+        """Add a new item, returning False if it already exists"""
+        if name in self.data:
+            return False
+        self.data[name] = {"price": price, "stock": stock, "category": category}
+        self._order[name] = len(self._order)
+        self._by_category.setdefault(category.title(), {})[name] = None
+        self._category_cents.setdefault(category.title(), 0)
+        self._change_stock(name, stock, initial=True)
+        return True
+
+    def add_stock(self, name, amount):
+        self._change_stock(name, amount)
+
+    def remove_stock(self, name, amount):
+        """Remove stock, returning False if there is not enough available"""
+        item = self.data[name]
+        if item["stock"] < amount:
+            return False
+        self._change_stock(name, -amount)
+        return True
+
+    def _change_stock(self, name, amount, initial=False):
+        """Apply a stock change and update the totals and low-stock set.
+
+        With initial, amount is the stock the item was added with, which is
+        already in its data, so only the totals change.
+        """
+        item = self.data[name]
+        if not initial:
+            item["stock"] += amount
+        value_change = to_cents(item["price"]) * amount
+        self.total_value_cents += value_change
+        self._category_cents[item["category"].title()] += value_change
+        if item["stock"] <= self.low_stock_threshold:
+            self._low_stock.add(name)
+        else:
+            self._low_stock.discard(name)
+
+    def check_movements(self, movements):
+        """Return why a batch of (kind, name, quantity) movements is invalid, or None"""
+        running = {}
+        for kind, name, quantity in movements:
+            if name not in self.data:
+                return f"Item not found in inventory: {name}"
+            sign = MOVEMENT_SIGNS.get(kind)
+            if sign is None:
+                return f"Invalid movement type: {kind}"
+            if kind != "adjustment" and quantity < 0:
+                return f"Quantity for a {kind} must not be negative: {name}"
+            stock = running.get(name, self.data[name]["stock"]) + sign * quantity
+            if stock < 0:
+                return f"Cannot remove more stock than available for {name}!"
+            running[name] = stock
+        return None
+
+    def apply_movements(self, movements, checked=False):
+        """Apply a batch of movements all-or-nothing.
+
+        Returns None when the batch was applied, otherwise the reason the
+        whole batch was rejected; nothing is changed in that case. Pass
+        checked=True for a batch check_movements() has already accepted.
+        """
+        error = None if checked else self.check_movements(movements)
+        if error:
+            return error
+        # One update per item, however many movements touched it
+        net = {}
+        for kind, name, quantity in movements:
+            net[name] = net.get(name, 0) + MOVEMENT_SIGNS[kind] * quantity
+        for name, amount in net.items():
+            self._change_stock(name, amount)
+        return None
+
+    def set_low_stock_threshold(self, threshold):
+        """Change the alert threshold; the only operation that rescans items"""
+        self.low_stock_threshold = threshold
+        self._low_stock = {name for name, item in self.data.items() if item["stock"] <= threshold}
+
+    def low_stock_items(self):
+        """Items at or below the threshold as {name: data}, in inventory order"""
+        names = sorted(self._low_stock, key=self._order.__getitem__)
+        return {name: self.data[name] for name in names}
+
+    def category_values(self):
+        """Inventory value of every category, in dollars"""
+        return {category: cents / 100 for category, cents in self._category_cents.items()}
+
+    def category_cents(self):
+        """Inventory value of every category, in integer cents"""
+        return dict(self._category_cents)
+
+    def in_category(self, category):
+        """Items in a category as {name: data}, looked up through the index"""
+        names = self._by_category.get(category.strip().title(), ())
+        return {name: self.data[name] for name in names}
+
 def format_currency(amount):
     """Format number as currency with $ and 2 decimal places"""
     return f"${amount:,.2f}"
 
-def display_inventory_value(inventory):
-    """Calculate and display total inventory value"""
-    total = sum(item["price"] * item["stock"] for item in inventory.values())
-    print(f"\nCurrent Inventory Value: {format_currency(total)}")
+def display_inventory_value(inventory, by_category=False):
+    """Display total inventory value, optionally with per-category subtotals"""
+    print(f"\nCurrent Inventory Value: {Money(inventory.total_value_cents)}")
+    if by_category:
+        for category, cents in inventory.category_cents().items():
+            print(f"- {category}: {Money(cents)}")
 
 def check_low_stock(inventory):
-    """Display items with stock ≤ 5 units"""
-    low_stock = {name: data for name, data in inventory.items() if data["stock"] <= 5}
+    """Display items with stock at or below the low-stock threshold"""
+    low_stock = inventory.low_stock_items()
     if low_stock:
         print("\n⚠️ LOW STOCK ALERT:")
         for name, data in low_stock.items():
@@ -20,7 +158,7 @@ def check_low_stock(inventory):
 def search_by_category(inventory):
     """Search and display items by category"""
     category = input("Category to search: ").strip().title()
-    matches = {name: data for name, data in inventory.items() if data["category"].title() == category}
+    matches = inventory.in_category(category)
     
     if matches:
         print(f"\nFound {len(matches)} items in {category}:")
@@ -41,11 +179,7 @@ def add_new_item(inventory):
         stock = int(input("Initial stock: "))
         category = input("Category: ").strip().title()
         
-        inventory[name] = {
-            "price": price,
-            "stock": stock,
-            "category": category
-        }
+        inventory.add_item(name, price, stock, category)
         print(f"{name} added to inventory.")
     except ValueError:
         print("Invalid input! Please enter numbers for price and stock.")
@@ -62,11 +196,10 @@ def update_stock(inventory):
         amount = int(input("Amount: "))
         
         if action == 'a':
-            inventory[name]["stock"] += amount
+            inventory.add_stock(name, amount)
             print(f"Added {amount} units to {name}.")
         elif action == 'r':
-            if inventory[name]["stock"] >= amount:
-                inventory[name]["stock"] -= amount
+            if inventory.remove_stock(name, amount):
                 print(f"Removed {amount} units from {name}.")
             else:
                 print("Cannot remove more stock than available!")
@@ -76,12 +209,12 @@ def update_stock(inventory):
         print("Invalid input! Please enter a whole number for amount.")
 
 def main():
-    inventory = {
+    inventory = Inventory({
         "Laptop": {"price": 999.99, "stock": 2, "category": "Electronics"},
         "Phone": {"price": 599.99, "stock": 15, "category": "Electronics"},
         "Mouse": {"price": 24.99, "stock": 3, "category": "Accessories"},
         "Keyboard": {"price": 49.99, "stock": 8, "category": "Accessories"}
-    }
+    })
     
     while True:
         print("\n=== SMART INVENTORY MANAGER ===")
@@ -107,7 +240,7 @@ def main():
         elif choice == '4':
             check_low_stock(inventory)
         elif choice == '5':
-            display_inventory_value(inventory)
+            display_inventory_value(inventory, by_category=True)
         elif choice == '6':
             print("Exiting inventory manager. Goodbye!")
             break
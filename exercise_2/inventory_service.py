@@ -0,0 +1,264 @@
+"""Concurrent inventory service over a JSON-lines TCP protocol (standard library only).
+
+Every request is one JSON object on its own line and gets one JSON line back:
+
+    {"op": "add_item", "name": "Laptop", "price": 999.99, "stock": 2, "category": "Electronics"}
+    {"op": "update_stock", "name": "Laptop", "action": "r", "amount": 1}
+    {"op": "search", "category": "Electronics"}
+    {"op": "low_stock"}
+    {"op": "value"}
+
+Replies are {"ok": true, ...} or {"ok": false, "error": "..."}. A write
+whose change was made but could not be fsynced yet gets {"ok": false,
+"pending": true, "error": "..."}: it is saved with the next group commit,
+so sending it again would apply it twice.
+
+Writes take the lock of the shard their item hashes to. With --data-dir the
+changes also go through a StockLedger, and a write holds its shard lock
+until the group commit covering it has been fsynced. Writes to items in
+other shards keep going meanwhile and share that same disk sync.
+
+Usage:
+    python inventory_service.py serve [--port 8765] [--data-dir DIR]
+    python inventory_service.py bench [--port 8765] [--clients 50] [--requests 2000]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from arena.jsonlines import encode, print_latencies, run_clients, serve_lines
+from inventory_manager import Inventory
+from stock_ledger import StockLedger
+
+DEFAULT_PORT = 8765
+
+
+def _pending_reply(error):
+    """Reply for a change that was made but whose group commit failed"""
+    return {"ok": False, "pending": True,
+            "error": f"Change made but not saved yet: {error}. It is saved with the next commit; do not resend it."}
+
+
+class InventoryService:
+    """Inventory operations guarded by sharded locks, with optional durability"""
+
+    def __init__(self, inventory=None, ledger=None, shards=64):
+        self.ledger = ledger
+        self.inventory = ledger.inventory if ledger else (inventory or Inventory())
+        self._locks = [asyncio.Lock() for _ in range(shards)]
+        self._commit_waiters = []
+        self._committer = None
+        # One thread does every log write, so writes never overlap
+        self._writer = ThreadPoolExecutor(max_workers=1) if ledger else None
+        self._writing = None
+
+    def _lock_for(self, name):
+        # crc32 rather than hash() so shards are stable across processes
+        return self._locks[zlib.crc32(name.encode("utf-8")) % len(self._locks)]
+
+    async def _durable(self):
+        """Wait until everything logged so far has been fsynced"""
+        if self.ledger is None:
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._commit_waiters.append(waiter)
+        if self._committer is None or self._committer.done():
+            self._committer = asyncio.create_task(self._group_commit())
+        await waiter
+
+    async def _group_commit(self):
+        """Commit in rounds: each round syncs every write that arrived before it"""
+        while self._commit_waiters:
+            waiters, self._commit_waiters = self._commit_waiters, []
+            data, count = self.ledger.pending_records()
+            self._writing = self._writer.submit(self.ledger.write_records, data)
+            try:
+                await asyncio.wrap_future(self._writing)
+            except OSError as error:
+                # The records stay buffered and go out with the next round
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(error)
+            else:
+                self.ledger.discard_records(count)
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+
+    async def close(self):
+        """Let the last group commit finish, then snapshot and close the ledger"""
+        if self.ledger is None:
+            return
+        if self._committer is not None:
+            await asyncio.wait([self._committer])
+        # The committer may have been cancelled with its write still running
+        if self._writing is not None:
+            wait([self._writing])
+        self._writer.shutdown()
+        self.ledger.snapshot()
+        self.ledger.close()
+
+    async def add_item(self, name, price, stock, category):
+        async with self._lock_for(name):
+            if self.ledger:
+                added = self.ledger.add_item(name, price, stock, category)
+            else:
+                added = self.inventory.add_item(name, price, stock, category)
+            if not added:
+                return {"ok": False, "error": "Item already exists in inventory!"}
+            try:
+                await self._durable()
+            except OSError as error:
+                return _pending_reply(error)
+        return {"ok": True}
+
+    async def update_stock(self, name, action, amount):
+        if action not in ("a", "r"):
+            return {"ok": False, "error": "Invalid action! Please enter 'a' or 'r'."}
+        if amount < 0:
+            return {"ok": False, "error": "Amount must not be negative."}
+        movement = ("receipt" if action == "a" else "sale", name, amount)
+        async with self._lock_for(name):
+            if self.ledger:
+                error = self.ledger.submit([movement])
+            else:
+                error = self.inventory.apply_movements([movement])
+            if error:
+                return {"ok": False, "error": error}
+            try:
+                await self._durable()
+            except OSError as error:
+                return _pending_reply(error)
+            stock = self.inventory[name]["stock"]
+        return {"ok": True, "stock": stock}
+
+    # Reads use the indexes and totals the Inventory maintains, so they never
+    # wait for a lock and cost O(matches) or O(1)
+
+    def search(self, category):
+        items = self.inventory.in_category(category)
+        return {"ok": True, "items": items}
+
+    def low_stock(self):
+        return {"ok": True, "items": self.inventory.low_stock_items()}
+
+    def value(self):
+        return {
+            "ok": True,
+            "total": self.inventory.total_value,
+            "categories": self.inventory.category_values(),
+        }
+
+    async def handle(self, request):
+        """Dispatch one decoded request to the matching operation"""
+        op = request.get("op")
+        try:
+            if op == "add_item":
+                return await self.add_item(
+                    request["name"].strip().title(), float(request["price"]),
+                    int(request["stock"]), request["category"].strip().title())
+            if op == "update_stock":
+                return await self.update_stock(
+                    request["name"].strip().title(), request["action"], int(request["amount"]))
+            if op == "search":
+                return self.search(request["category"])
+            if op == "low_stock":
+                return self.low_stock()
+            if op == "value":
+                return self.value()
+        except KeyError as missing:
+            return {"ok": False, "error": f"Missing field: {missing.args[0]}"}
+        except (TypeError, ValueError, AttributeError):
+            return {"ok": False, "error": "Invalid input! Please check the request fields."}
+        except OSError as error:
+            # The ledger took the change back, so it was neither applied nor logged
+            return {"ok": False, "error": f"Could not save the change: {error}"}
+        return {"ok": False, "error": f"Unknown operation: {op}"}
+
+    async def serve_client(self, reader, writer):
+        await serve_lines(reader, writer, self.handle)
+
+
+async def serve(host, port, data_dir=None, shards=64):
+    # The service schedules its own group commits and snapshots on shutdown,
+    # so the ledger must never sync or compact by itself on the event loop
+    ledger = StockLedger(data_dir, group_size=sys.maxsize, snapshot_every=sys.maxsize) if data_dir else None
+    service = InventoryService(ledger=ledger, shards=shards)
+    server = await asyncio.start_server(service.serve_client, host, port)
+    print(f"Inventory service listening on {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+async def _bench_client(host, port, requests, skus, write_ratio, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(requests):
+            if random.random() < write_ratio:
+                request = {"op": "update_stock", "name": f"Sku{random.randrange(skus)}",
+                           "action": "a", "amount": 1}
+            else:
+                request = random.choice([{"op": "value"}, {"op": "low_stock"},
+                                         {"op": "search", "category": "Bench"}])
+            start = time.perf_counter()
+            writer.write(encode(request))
+            await writer.drain()
+            await reader.readline()
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def bench(host, port, clients, requests, skus, write_ratio):
+    """Drive the service with concurrent clients and report throughput and latency"""
+    reader, writer = await asyncio.open_connection(host, port)
+    for i in range(skus):
+        writer.write(encode({"op": "add_item", "name": f"Sku{i}", "price": 1.0, "stock": 10, "category": "Bench"}))
+    await writer.drain()
+    for _ in range(skus):
+        await reader.readline()
+    writer.close()
+
+    latencies, elapsed, _ = await run_clients(
+        clients, lambda latencies: _bench_client(host, port, requests, skus, write_ratio, latencies))
+    print(f"Requests: {len(latencies):,} from {clients} clients in {elapsed:.2f}s")
+    print(f"Throughput: {len(latencies) / elapsed:,.0f} requests/s")
+    print_latencies(latencies)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent inventory service")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_command = commands.add_parser("serve", help="run the service")
+    serve_command.add_argument("--data-dir", help="persist changes through a stock ledger here")
+    serve_command.add_argument("--shards", type=int, default=64)
+    bench_command = commands.add_parser("bench", help="load-test a running service")
+    bench_command.add_argument("--clients", type=int, default=50)
+    bench_command.add_argument("--requests", type=int, default=2000, help="requests per client")
+    bench_command.add_argument("--skus", type=int, default=1000)
+    bench_command.add_argument("--write-ratio", type=float, default=0.8)
+    for command in (serve_command, bench_command):
+        command.add_argument("--host", default="127.0.0.1")
+        command.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "serve":
+            asyncio.run(serve(args.host, args.port, args.data_dir, args.shards))
+        else:
+            asyncio.run(bench(args.host, args.port, args.clients, args.requests,
+                              args.skus, args.write_ratio))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""Write-ahead logged stock movements with group commit and snapshots.
+
+A ledger directory holds:
+
+    stock.wal      one JSON record per line: a new item or a movement batch
+    stock.snap     JSON snapshot of the whole inventory at some sequence number
+
+Every accepted batch is appended to the log buffer before it touches the
+inventory, and buffered records are written and fsynced together once
+group_size of them are waiting (or on commit()). A batch counts as durable
+after the commit that covers it. Restart loads the snapshot and replays
+only the records written after it.
+
+Usage:
+    python stock_ledger.py DIR add-item NAME PRICE STOCK CATEGORY
+    python stock_ledger.py DIR replay movements.csv [--batch-size N]
+    python stock_ledger.py DIR snapshot
+    python stock_ledger.py DIR show
+
+movements.csv rows are "kind,item,quantity" with kind one of receipt,
+sale or adjustment.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from arena.durable_log import EventLog
+from inventory_manager import Inventory, check_low_stock, display_inventory_value
+
+WAL_NAME = "stock.wal"
+SNAPSHOT_NAME = "stock.snap"
+
+
+class StockLedger:
+    """Inventory whose changes go through a write-ahead log"""
+
+    def __init__(self, directory, group_size=64, snapshot_every=10_000, **inventory_options):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self._snapshot_path = os.path.join(directory, SNAPSHOT_NAME)
+        self._wal = EventLog(os.path.join(directory, WAL_NAME), group_size)
+
+        os.makedirs(directory, exist_ok=True)
+        self.inventory, seq = self._load_snapshot(inventory_options)
+        self._wal.replay(seq, self._apply)
+
+    def _load_snapshot(self, inventory_options):
+        if not os.path.exists(self._snapshot_path):
+            return Inventory(**inventory_options), 0
+        with open(self._snapshot_path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        return Inventory(snapshot["items"], **inventory_options), snapshot["seq"]
+
+    def _apply(self, record):
+        # Logged batches were checked before they were logged
+        if "item" in record:
+            self.inventory.add_item(*record["item"])
+        else:
+            self.inventory.apply_movements(record["movements"], checked=True)
+
+    def add_item(self, name, price, stock, category):
+        """Log and add a new item, returning False if it already exists"""
+        if name in self.inventory:
+            return False
+        self._log_and_apply({"item": [name, price, stock, category]})
+        return True
+
+    def submit(self, movements):
+        """Log and apply one batch of (kind, name, quantity) movements.
+
+        Returns None when the batch was accepted, otherwise the reason it
+        was rejected. Rejected batches are neither logged nor applied.
+        """
+        movements = [tuple(movement) for movement in movements]
+        error = self.inventory.check_movements(movements)
+        if error:
+            return error
+        self._log_and_apply({"movements": movements})
+        return None
+
+    def _log_and_apply(self, record):
+        try:
+            self._wal.append(record)
+        except OSError:
+            # The record filled a group whose write failed. It is not applied,
+            # so it must not reach the log with a later write either; the
+            # records buffered before it are applied and stay for that write.
+            self._wal.retract()
+            raise
+        self._apply(record)
+        if self._wal.since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def commit(self):
+        """Write and fsync every buffered record with one disk sync"""
+        self._wal.flush()
+
+    def pending_records(self):
+        """(encoded records, how many) still buffered, ready for write_records()"""
+        return self._wal.pending()
+
+    def write_records(self, data):
+        """Append already-encoded records to the log and fsync them"""
+        self._wal.write(data)
+
+    def discard_records(self, count):
+        """Drop the first count buffered records once write_records() stored them"""
+        self._wal.discard(count)
+
+    def snapshot(self):
+        """Write the full inventory atomically, then empty the log"""
+        def write(f, seq):
+            f.write(json.dumps({"seq": seq, "items": self.inventory.data}).encode("utf-8"))
+
+        self._wal.compact(self._snapshot_path, write)
+
+    def close(self):
+        self._wal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_movements(path):
+    """Yield (line_number, (kind, name, quantity)) from a movements CSV file"""
+    with open(path, newline="", encoding="utf-8") as f:
+        for line_number, row in enumerate(csv.reader(f), 1):
+            if len(row) != 3 or row[0].strip().lower() == "kind":
+                continue
+            kind, name, quantity = row
+            try:
+                yield line_number, (kind.strip().lower(), name.strip().title(), int(quantity))
+            except ValueError:
+                print(f"line {line_number}: Invalid quantity! Please enter a whole number.", file=sys.stderr)
+
+
+def replay_file(ledger, path, batch_size):
+    """Submit a movements file in fixed-size batches; returns (accepted, rejected)"""
+    accepted = rejected = 0
+    batch = []
+
+    def submit():
+        nonlocal accepted, rejected
+        error = ledger.submit([movement for _, movement in batch])
+        if error:
+            rejected += len(batch)
+            print(f"lines {batch[0][0]}-{batch[-1][0]} rejected: {error}", file=sys.stderr)
+        else:
+            accepted += len(batch)
+        batch.clear()
+
+    for line_number, movement in read_movements(path):
+        batch.append((line_number, movement))
+        if len(batch) >= batch_size:
+            submit()
+    if batch:
+        submit()
+    ledger.commit()
+    return accepted, rejected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write-ahead logged stock movements")
+    parser.add_argument("directory", help="ledger directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add_item = commands.add_parser("add-item", help="add a new item")
+    add_item.add_argument("name")
+    add_item.add_argument("price", type=float)
+    add_item.add_argument("stock", type=int)
+    add_item.add_argument("category")
+    replay = commands.add_parser("replay", help="apply a movements CSV file")
+    replay.add_argument("path")
+    replay.add_argument("--batch-size", type=int, default=1000)
+    commands.add_parser("snapshot", help="compact the log into a snapshot")
+    commands.add_parser("show", help="show inventory value and low stock")
+    args = parser.parse_args(argv)
+
+    with StockLedger(args.directory) as ledger:
+        if args.command == "add-item":
+            name = args.name.strip().title()
+            if ledger.add_item(name, args.price, args.stock, args.category.strip().title()):
+                print(f"{name} added to inventory.")
+            else:
+                print("Item already exists in inventory!")
+        elif args.command == "replay":
+            start = time.perf_counter()
+            accepted, rejected = replay_file(ledger, args.path, args.batch_size)
+            elapsed = time.perf_counter() - start
+            rate = accepted / elapsed if elapsed else 0
+            print(f"Applied {accepted} movements ({rejected} rejected) in {elapsed:.2f}s "
+                  f"({rate:,.0f} movements/s)")
+        elif args.command == "snapshot":
+            ledger.snapshot()
+            print("Snapshot written.")
+        display_inventory_value(ledger.inventory, by_category=True)
+        check_low_stock(ledger.inventory)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""On-disk index of breached passwords for the common-password criterion.
+
+The index is one file that is memory mapped, never read into memory:
+
+    header     magic, entry count, Bloom filter size in bits, hash count
+    offsets    count + 1 little-endian uint64 offsets into the data blob
+    bloom      Bloom filter bit array
+    data       every distinct lowercased password, sorted, back to back
+
+A lookup checks the Bloom filter first, which rejects most passwords that
+are not in the corpus without touching the data. Only possible hits go on
+to a binary search over the sorted entries. Opening the file only parses
+the header, and every process that opens it shares the same page cache,
+so a pool of batch workers costs one copy of the corpus in memory.
+
+Usage:
+    python breach_index.py build breached.txt breached.idx [--fp-rate 0.01]
+    python breach_index.py check breached.idx PASSWORD...
+"""
+import argparse
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+HEADER = struct.Struct("<8sQQQ")
+MAGIC = b"PWINDEX1"
+# Lines that are not valid UTF-8 are still indexed byte for byte
+ENCODING_ERRORS = "surrogateescape"
+
+
+def normalize(password):
+    """Index key for a password: lowercased, as the common check compares"""
+    return password.lower().encode("utf-8", ENCODING_ERRORS)
+
+
+def bloom_positions(key, bits, hashes):
+    """Bit positions of a key, by double hashing one 128-bit digest"""
+    digest = hashlib.blake2b(key, digest_size=16).digest()
+    first = int.from_bytes(digest[:8], "little")
+    second = int.from_bytes(digest[8:], "little") | 1
+    return [(first + i * second) % bits for i in range(hashes)]
+
+
+class BreachIndex:
+    """Read-only, memory-mapped breached-password lookup"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.bloom_bits, self.bloom_hashes = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a breached-password index")
+
+        view = memoryview(self._map)
+        start = HEADER.size
+        end = start + 8 * (self.count + 1)
+        self._offsets = view[start:end].cast("Q")
+        self._bloom = view[end:end + (self.bloom_bits + 7) // 8]
+        self._data_start = end + len(self._bloom)
+        self._views = [view, self._offsets, self._bloom]
+
+    def __len__(self):
+        return self.count
+
+    def _entry(self, i):
+        return self._map[self._data_start + self._offsets[i]:self._data_start + self._offsets[i + 1]]
+
+    def __contains__(self, password):
+        key = normalize(password)
+        bloom = self._bloom
+        for position in bloom_positions(key, self.bloom_bits, self.bloom_hashes):
+            if not bloom[position >> 3] & (1 << (position & 7)):
+                return False
+
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low < self.count and self._entry(low) == key
+
+    def close(self):
+        for view in getattr(self, "_views", ()):
+            view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _sorted_runs(source, run_size, directory):
+    """Split the input into sorted, de-duplicated temporary run files.
+
+    Returns the runs and their total length, an upper bound on the number
+    of distinct keys.
+    """
+    runs = []
+    keys = set()
+    total = 0
+
+    def flush():
+        nonlocal total
+        run = tempfile.TemporaryFile(dir=directory)
+        for key in sorted(keys):
+            run.write(key + b"\n")
+        run.seek(0)
+        runs.append(run)
+        total += len(keys)
+        keys.clear()
+
+    for line in source:
+        password = line.rstrip("\r\n")
+        if password:
+            keys.add(normalize(password))
+            if len(keys) >= run_size:
+                flush()
+    if keys:
+        flush()
+    return runs, total
+
+
+def build_index(source_path, index_path, false_positive_rate=0.01, run_size=1_000_000):
+    """Build an index from a file with one breached password per line.
+
+    Sorting is done in runs of run_size entries that are merged from disk,
+    so building a multi-million entry corpus needs little memory.
+    """
+    directory = os.path.dirname(os.path.abspath(index_path))
+    with open(source_path, encoding="utf-8", errors=ENCODING_ERRORS) as source:
+        runs, upper_bound = _sorted_runs(source, run_size, directory)
+
+    # Size the Bloom filter for the requested false-positive rate; keys that
+    # repeat across runs only make it a little larger than it needs to be
+    bits = max(8, math.ceil(-upper_bound * math.log(false_positive_rate) / math.log(2) ** 2))
+    hashes = max(1, round(bits / max(upper_bound, 1) * math.log(2)))
+    bloom = bytearray((bits + 7) // 8)
+
+    with tempfile.TemporaryFile(dir=directory) as data, \
+            tempfile.TemporaryFile(dir=directory) as offsets_file:
+        # Merge the runs, writing every distinct key once. The keys are
+        # compared without their newlines: a key holding a byte below "\n",
+        # such as a tab, would otherwise sort after its own prefix.
+        offsets = array("Q", [0])
+        position = count = 0
+        previous = None
+        for key in heapq.merge(*((line[:-1] for line in run) for run in runs)):
+            if key == previous:
+                continue
+            previous = key
+            data.write(key)
+            position += len(key)
+            count += 1
+            offsets.append(position)
+            for bit in bloom_positions(key, bits, hashes):
+                bloom[bit >> 3] |= 1 << (bit & 7)
+            if len(offsets) >= 65536:
+                offsets_file.write(offsets.tobytes())
+                offsets = array("Q")
+        offsets_file.write(offsets.tobytes())
+        for run in runs:
+            run.close()
+
+        temp_path = index_path + ".tmp"
+        with open(temp_path, "wb") as index:
+            index.write(HEADER.pack(MAGIC, count, bits, hashes))
+            offsets_file.seek(0)
+            shutil.copyfileobj(offsets_file, index)
+            index.write(bloom)
+            data.seek(0)
+            shutil.copyfileobj(data, index)
+        os.replace(temp_path, index_path)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Breached-password index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="build an index from a password list")
+    build.add_argument("source")
+    build.add_argument("index")
+    build.add_argument("--fp-rate", type=float, default=0.01, help="Bloom filter false-positive rate")
+    check = commands.add_parser("check", help="look passwords up in an index")
+    check.add_argument("index")
+    check.add_argument("passwords", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        count = build_index(args.source, args.index, args.fp_rate)
+        print(f"Indexed {count:,} passwords in {time.perf_counter() - start:.1f}s")
+    else:
+        start = time.perf_counter()
+        with BreachIndex(args.index) as index:
+            print(f"Opened {len(index):,} entries in {(time.perf_counter() - start) * 1000:.2f} ms")
+            for password in args.passwords:
+                print(f"{password}: {'❌ breached' if password in index else '✅ not found'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,95 +1,221 @@
-# COMMON_PASSWORDS = [
-#     'password', '123456', '123456789', '12345', 'qwerty',
-#     'abc123', 'password1', 'admin', 'welcome', 'letmein',
-#     'monkey', 'football', 'iloveyou', '1234567', '123123',
-#     'sunshine', 'master', 'hello', 'shadow', 'ashley',
-#     'ninja', 'passw0rd', '1234', '12345678', '123456a'
-# ]
+import argparse
+import random
+import string
+import timeit
 
-# SPECIAL_CHARS = set('!@#$%^&*')
+from breach_index import BreachIndex
 
-# def has_uppercase(password):
-#     return any(c.isupper() for c in password)
+COMMON_PASSWORDS = [
+    'password', '123456', '123456789', '12345', 'qwerty',
+    'abc123', 'password1', 'admin', 'welcome', 'letmein',
+    'monkey', 'football', 'iloveyou', '1234567', '123123',
+    'sunshine', 'master', 'hello', 'shadow', 'ashley',
+    'ninja', 'passw0rd', '1234', '12345678', '123456a'
+]
 
-# def has_lowercase(password):
-#     return any(c.islower() for c in password)
+SPECIAL_CHARS = set('!@#$%^&*')
 
-# def has_number(password):
-#     return any(c.isdigit() for c in password)
+def has_uppercase(password):
+    return any(c.isupper() for c in password)
 
-# def has_special_char(password):
-#     return any(c in SPECIAL_CHARS for c in password)
+def has_lowercase(password):
+    return any(c.islower() for c in password)
 
-# def analyze_password(password):
-#     score = 0
-#     feedback = []
-#     suggestions = []
+def has_number(password):
+    return any(c.isdigit() for c in password)
+
+def has_special_char(password):
+    return any(c in SPECIAL_CHARS for c in password)
+
+# Character class bits used by the single-pass scanner
+UPPERCASE, LOWERCASE, NUMBER, SPECIAL = 1, 2, 4, 8
+
+def _classify(c):
+    if c.isupper():
+        return UPPERCASE
+    if c.islower():
+        return LOWERCASE
+    if c.isdigit():
+        return NUMBER
+    if c in SPECIAL_CHARS:
+        return SPECIAL
+    return 0
+
+# Class bit of every ASCII byte, for bytes.translate
+CLASS_TABLE = bytes(_classify(chr(b)) if b < 128 else 0 for b in range(256))
+
+COMMON_PASSWORD_SET = frozenset(COMMON_PASSWORDS)
+COMMON_PASSWORD_LENGTHS = frozenset(map(len, COMMON_PASSWORDS))
+
+# Optional breached-password corpus checked after the built-in list
+breach_index = None
+
+def load_breach_index(path):
+    """Also treat every password in a breach_index.py index file as common"""
+    global breach_index
+    breach_index = BreachIndex(path)
+
+def character_classes(password):
+    """Bitmask of the character classes present, found in a single pass"""
+    if password.isascii():
+        # One translate pass maps every byte to its class bit; the presence
+        # tests after it are memchr calls over that result, all in C
+        found = password.encode("ascii").translate(CLASS_TABLE)
+        return ((UPPERCASE in found) | (LOWERCASE in found) << 1
+                | (NUMBER in found) << 2 | (SPECIAL in found) << 3)
+    classes = 0
+    for c in password:
+        classes |= _classify(c)
+    return classes
+
+def is_common_password(password):
+    # Skip the lower() copy for lengths no common password has
+    if len(password) in COMMON_PASSWORD_LENGTHS and password.lower() in COMMON_PASSWORD_SET:
+        return True
+    return breach_index is not None and password in breach_index
+
+STRENGTH_LEVELS = [
+    (40, "Weak"),
+    (60, "Fair"),
+    (80, "Good"),
+    (100, "Strong"),
+    (120, "Excellent")
+]
+
+def strength_level(score):
+    return next((level for threshold, level in STRENGTH_LEVELS if score <= threshold), "Excellent")
+
+# Bits for the two criteria that are not character classes
+LENGTH_OK, NOT_COMMON = 16, 32
+CRITERIA_BITS = [
+    ("length", LENGTH_OK),
+    ("uppercase", UPPERCASE),
+    ("lowercase", LOWERCASE),
+    ("number", NUMBER),
+    ("special", SPECIAL),
+    ("common", NOT_COMMON)
+]
+
+def _score_entry(passed):
+    failed = tuple(criterion for criterion, bit in CRITERIA_BITS if not passed & bit)
+    score = 120 - 20 * len(failed)
+    return score, strength_level(score), failed
+
+# (score, strength, failed criteria) for every combination of passed criteria
+SCORE_TABLE = [_score_entry(passed) for passed in range(64)]
+
+def score_password(password):
+    """Score, strength and failed criteria without building any feedback text"""
+    passed = character_classes(password)
+    if len(password) >= 8:
+        passed |= LENGTH_OK
+    if not is_common_password(password):
+        passed |= NOT_COMMON
+    return SCORE_TABLE[passed]
+
+def analyze_password(password):
+    score = 0
+    feedback = []
+    suggestions = []
+    failed = []
+    
+    # Length check
+    if len(password) >= 8:
+        score += 20
+        feedback.append("✅ Length requirement (8+ chars)")
+    else:
+        feedback.append("❌ Too short (minimum 8 characters)")
+        failed.append("length")
+        suggestions.append("- Make your password at least 8 characters long")
     
-#     # Length check
-#     if len(password) >= 8:
-#         score += 20
-#         feedback.append("✅ Length requirement (8+ chars)")
-#     else:
-#         feedback.append("❌ Too short (minimum 8 characters)")
-#         suggestions.append("- Make your password at least 8 characters long")
+    # Character type checks
+    checks = [
+        ("uppercase", UPPERCASE, "uppercase letters", "Add at least one uppercase letter"),
+        ("lowercase", LOWERCASE, "lowercase letters", "Add at least one lowercase letter"),
+        ("number", NUMBER, "numbers", "Include at least one number"),
+        ("special", SPECIAL, "special characters (!@#$%^&*)", "Add at least one special character (!@#$%^&*)")
+    ]
     
-#     # Character type checks
-#     checks = [
-#         (has_uppercase, "uppercase letters", "Add at least one uppercase letter"),
-#         (has_lowercase, "lowercase letters", "Add at least one lowercase letter"),
-#         (has_number, "numbers", "Include at least one number"),
-#         (has_special_char, "special characters (!@#$%^&*)", "Add at least one special character (!@#$%^&*)")
-#     ]
+    classes = character_classes(password)
+    for criterion, bit, description, suggestion in checks:
+        if classes & bit:
+            score += 20
+            feedback.append(f"✅ Contains {description}")
+        else:
+            feedback.append(f"❌ Missing {description}")
+            suggestions.append(f"- {suggestion}")
+            failed.append(criterion)
     
-#     for check, description, suggestion in checks:
-#         if check(password):
-#             score += 20
-#             feedback.append(f"✅ Contains {description}")
-#         else:
-#             feedback.append(f"❌ Missing {description}")
-#             suggestions.append(f"- {suggestion}")
+    # Common password check
+    if not is_common_password(password):
+        score += 20
+        feedback.append("✅ Not a common password")
+    else:
+        feedback.append("❌ Common password detected")
+        failed.append("common")
+        suggestions.append("- Avoid using common passwords")
+        suggestions.append("- Consider using a passphrase instead")
     
-#     # Common password check
-#     if password.lower() not in COMMON_PASSWORDS:
-#         score += 20
-#         feedback.append("✅ Not a common password")
-#     else:
-#         feedback.append("❌ Common password detected")
-#         suggestions.append("- Avoid using common passwords")
-#         suggestions.append("- Consider using a passphrase instead")
+    # Determine strength level
+    strength = strength_level(score)
     
-#     # Determine strength level
-#     strength_levels = [
-#         (40, "Weak"),
-#         (60, "Fair"),
-#         (80, "Good"),
-#         (100, "Strong"),
-#         (120, "Excellent")
-#     ]
+    return {
+        'score': score,
+        'strength': strength,
+        'feedback': feedback,
+        'suggestions': suggestions,
+        'failed': failed
+    }
+
+def _reference_score(password):
+    """The original multi-pass scoring, kept for the benchmark comparison"""
+    score = 20 if len(password) >= 8 else 0
+    for check in (has_uppercase, has_lowercase, has_number, has_special_char):
+        if check(password):
+            score += 20
+    if password.lower() not in COMMON_PASSWORDS:
+        score += 20
+    return score
+
+def benchmark(count=200_000):
+    alphabet = string.ascii_letters + string.digits + "!@#$%^&*-_ "
+    passwords = [''.join(random.choices(alphabet, k=random.randint(4, 16))) for _ in range(count)]
+    passwords += COMMON_PASSWORDS + ["Pässwört123!", "ПАРОЛЬ", "Ab1!"]
+    
+    for password in passwords:
+        assert score_password(password)[0] == _reference_score(password), password
+    
+    old = min(timeit.repeat(lambda: [_reference_score(p) for p in passwords], number=1, repeat=3))
+    new = min(timeit.repeat(lambda: [score_password(p) for p in passwords], number=1, repeat=3))
+    print(f"Scored {len(passwords):,} passwords")
+    print(f"Multi-pass:  {old / len(passwords) * 1e9:,.0f} ns/password")
+    print(f"Single-pass: {new / len(passwords) * 1e9:,.0f} ns/password ({old / new:.1f}x faster)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Password security analyzer")
+    parser.add_argument("--bench", action="store_true", help="benchmark the scoring core")
+    parser.add_argument("--breach-index", help="index file built with breach_index.py")
+    args = parser.parse_args()
     
-#     strength = next((level for threshold, level in strength_levels if score <= threshold), "Excellent")
+    if args.bench:
+        benchmark()
+        return
+    if args.breach_index:
+        load_breach_index(args.breach_index)
     
-#     return {
-#         'score': score,
-#         'strength': strength,
-#         'feedback': feedback,
-#         'suggestions': suggestions
-#     }
-
-# def main():
-#     print("\n=== PASSWORD SECURITY ANALYZER ===")
-#     password = input("Enter password to analyze: ")
+    print("\n=== PASSWORD SECURITY ANALYZER ===")
+    password = input("Enter password to analyze: ")
     
-#     results = analyze_password(password)
+    results = analyze_password(password)
     
-#     print("\n🔒 SECURITY ANALYSIS RESULTS")
-#     print(f"Password: {password}")
-#     print(f"Score: {results['score']}/120 ({results['strength']})")
-#     print("\n".join(results['feedback']))
+    print("\n🔒 SECURITY ANALYSIS RESULTS")
+    print(f"Password: {password}")
+    print(f"Score: {results['score']}/120 ({results['strength']})")
+    print("\n".join(results['feedback']))
     
-#     if results['suggestions']:
-#         print("\n💡 SUGGESTIONS:")
-#         print("\n".join(results['suggestions']))
+    if results['suggestions']:
+        print("\n💡 SUGGESTIONS:")
+        print("\n".join(results['suggestions']))
 
-# if __name__ == "__main__":
-#     main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Batch password auditing across a process pool.
+
+Usage:
+    python password_batch.py dump.txt -o results.jsonl --workers 8
+    cat dump.txt | python password_batch.py - --format csv > results.csv
+
+Passwords are read one per line and scored in chunks by worker processes,
+with the same six 20-point criteria and strength levels as
+analyze_password (through its feedback-free core, score_password). Only
+a fixed number of chunks is in flight at any time and results are
+written in input order as soon as they are ready, so memory stays flat
+however large the input is.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+from itertools import islice
+
+from arena.pools import ordered_map
+from password_analyzer import STRENGTH_LEVELS, load_breach_index, score_password
+from password_rules import default_pipeline
+
+# Undecodable bytes in dumps survive the round trip as lone surrogates
+ENCODING_ERRORS = "surrogateescape"
+
+
+def read_passwords(stream):
+    """Yield one password per line, keeping any spaces inside it"""
+    for line in stream:
+        yield line.rstrip("\r\n")
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+# Rule pipeline of this process, created on first use in each worker
+_pipeline = None
+
+
+def score_chunk(passwords):
+    """Score a chunk of passwords; runs inside the worker processes"""
+    return [(password, *score_password(password)) for password in passwords], 0, 0
+
+
+def rule_chunk(passwords):
+    """Run a chunk through the memoized rule pipeline.
+
+    Returns the rows plus this chunk's cache hits and misses, since every
+    worker process keeps its own cache.
+    """
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = default_pipeline()
+    hits, misses = _pipeline.hits, _pipeline.misses
+    rows = []
+    for password in passwords:
+        result = _pipeline.analyze(password)
+        rows.append((password, result["score"], result["strength"], result["failed"],
+                     result["warnings"], result["entropy_bits"]))
+    return rows, _pipeline.hits - hits, _pipeline.misses - misses
+
+
+def score_stream(passwords, workers, chunk_size, breach_index_path=None, rules=False, cache_stats=None):
+    """Yield result rows in input order, adding cache hits/misses to cache_stats"""
+    chunks = chunked(passwords, chunk_size)
+    score = rule_chunk if rules else score_chunk
+    if cache_stats is None:
+        cache_stats = Counter()
+
+    def unpack(rows, hits, misses):
+        cache_stats["hits"] += hits
+        cache_stats["misses"] += misses
+        return rows
+
+    # Each worker maps the same index file, so the corpus is shared through
+    # the page cache rather than copied into every process
+    initializer, initargs = (load_breach_index, (breach_index_path,)) if breach_index_path else (None, ())
+    for result in ordered_map(score, chunks, workers, initializer, initargs):
+        yield from unpack(*result)
+
+
+def write_results(results, stream, fmt, rules=False):
+    """Write results as they arrive and count them by strength"""
+    strengths = Counter()
+    columns = ["password", "score", "strength", "failed"]
+    if rules:
+        columns += ["warnings", "entropy_bits"]
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(columns)
+        for row in results:
+            writer.writerow([";".join(value) if isinstance(value, tuple) else value for value in row])
+            strengths[row[2]] += 1
+    else:
+        for row in results:
+            stream.write(json.dumps(dict(zip(columns, row))) + "\n")
+            strengths[row[2]] += 1
+    return strengths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit a file of passwords in batch")
+    parser.add_argument("input", help="one password per line, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="results file, or - for stdout")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--breach-index", help="index file built with breach_index.py")
+    parser.add_argument("--rules", action="store_true",
+                        help="also run the keyboard-walk, run and entropy detectors")
+    args = parser.parse_args(argv)
+
+    if args.workers is None:
+        args.workers = os.cpu_count() or 1
+
+    if args.input == "-":
+        source = open(sys.stdin.fileno(), encoding="utf-8", errors=ENCODING_ERRORS, closefd=False)
+    else:
+        source = open(args.input, encoding="utf-8", errors=ENCODING_ERRORS)
+    if args.output == "-":
+        output = open(sys.stdout.fileno(), "w", encoding="utf-8", errors=ENCODING_ERRORS,
+                      newline="", closefd=False)
+    else:
+        output = open(args.output, "w", encoding="utf-8", errors=ENCODING_ERRORS, newline="")
+
+    start = time.perf_counter()
+    with source, output:
+        cache_stats = Counter()
+        results = score_stream(read_passwords(source), args.workers, args.chunk_size,
+                               args.breach_index, args.rules, cache_stats)
+        strengths = write_results(results, output, args.format, args.rules)
+    elapsed = time.perf_counter() - start
+
+    total = sum(strengths.values())
+    rate = total / elapsed if elapsed else 0
+    print(f"Audited {total:,} passwords in {elapsed:.2f}s ({rate:,.0f}/s)", file=sys.stderr)
+    for _, level in STRENGTH_LEVELS:
+        print(f"{level}: {strengths[level]:,}", file=sys.stderr)
+    if args.rules:
+        print(f"Rule cache: {cache_stats['hits']:,} hits, {cache_stats['misses']:,} misses", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""Pluggable password rule pipeline with memoized results.
+
+Rules are registered on a RulePipeline with a relative cost and run
+cheapest first. Scored rules award the same 20 points per criterion as
+analyze_password. Advisory rules (keyboard walks, repeated or sequential
+runs, low entropy) add warnings without changing the score. A rule can
+end the pipeline early: once a password is known to be common, the more
+expensive advisory rules after it are skipped.
+
+Results are cached in a bounded LRU keyed by a BLAKE2 digest of the
+password, so duplicated entries in a dump are scored once and no
+plaintext is kept as a cache key.
+"""
+import hashlib
+import math
+import re
+from collections import Counter, OrderedDict
+
+from password_analyzer import (
+    LOWERCASE, NUMBER, SPECIAL, UPPERCASE, character_classes, is_common_password, strength_level,
+)
+
+KEYBOARD_ROWS = ["`1234567890-=", "qwertyuiop[]", "asdfghjkl;'", "zxcvbnm,./"]
+REPEATED_RUN = re.compile(r"(.)\1{2,}", re.DOTALL)
+
+
+class Rule:
+    """One registered check: cost orders it, points > 0 makes it scored"""
+
+    __slots__ = ("name", "check", "cost", "points", "criteria", "stop_on_failure")
+
+    def __init__(self, name, check, cost, points, criteria, stop_on_failure):
+        self.name = name
+        self.check = check
+        self.cost = cost
+        self.points = points
+        self.criteria = criteria
+        self.stop_on_failure = stop_on_failure
+
+
+class RulePipeline:
+    """Runs registered rules in cost order and memoizes the results"""
+
+    def __init__(self, cache_size=100_000):
+        self.rules = []
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, name, cost=1, points=0, criteria=1, stop_on_failure=False):
+        """Decorator registering check(password, findings) as a rule.
+
+        A check returns the list of criteria it failed (or warnings, for an
+        advisory rule), empty when the password passes. It may also store
+        values in the shared findings dict. A scored rule is worth points
+        for each of its criteria that passes.
+        """
+        def decorator(check):
+            self.rules.append(Rule(name, check, cost, points, criteria, stop_on_failure))
+            self.rules.sort(key=lambda rule: rule.cost)
+            self.clear_cache()
+            return check
+        return decorator
+
+    def analyze(self, password):
+        key = hashlib.blake2b(password.encode("utf-8", "surrogateescape"), digest_size=16).digest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return cached
+
+        self.misses += 1
+        result = self._run(password)
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def _run(self, password):
+        score = 0
+        failed = []
+        warnings = []
+        findings = {}
+        stopped = False
+        for rule in self.rules:
+            # Scored rules always run so the score stays complete; advisory
+            # rules are skipped once an earlier rule has stopped the pipeline
+            if stopped and not rule.points:
+                continue
+            outcome = rule.check(password, findings)
+            if rule.points:
+                score += rule.points * (rule.criteria - len(outcome))
+                failed.extend(outcome)
+            else:
+                warnings.extend(outcome)
+            if outcome and rule.stop_on_failure:
+                stopped = True
+        return {
+            "score": score,
+            "strength": strength_level(score),
+            "failed": tuple(failed),
+            "warnings": tuple(warnings),
+            "entropy_bits": findings.get("entropy_bits"),
+        }
+
+    def cache_info(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._cache),
+            "max_size": self.cache_size,
+        }
+
+    def clear_cache(self):
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+
+def keyboard_walk(password, length=4):
+    """First run of length+ adjacent keys along one keyboard row, or None"""
+    lowered = password.lower()
+    for row in KEYBOARD_ROWS:
+        for line in (row, row[::-1]):
+            for start in range(len(line) - length + 1):
+                if line[start:start + length] in lowered:
+                    return line[start:start + length]
+    return None
+
+
+def sequential_run(password, length=4):
+    """First run of length+ characters counting up or down, like abcd or 4321"""
+    run = 1
+    step = 0
+    for previous, current in zip(password, password[1:]):
+        difference = ord(current) - ord(previous)
+        if difference in (1, -1) and (run == 1 or difference == step):
+            run += 1
+            step = difference
+        else:
+            run = 2 if difference in (1, -1) else 1
+            step = difference
+        if run >= length:
+            return True
+    return False
+
+
+def entropy_bits(password):
+    """The lower of two estimates: Shannon entropy and character-pool size"""
+    if not password:
+        return 0.0
+    counts = Counter(password)
+    length = len(password)
+    shannon = length * sum(count / length * math.log2(length / count) for count in counts.values())
+
+    classes = character_classes(password)
+    pool = (26 if classes & UPPERCASE else 0) + (26 if classes & LOWERCASE else 0) \
+        + (10 if classes & NUMBER else 0) + (len("!@#$%^&*") if classes & SPECIAL else 0)
+    if any(not c.isalnum() and c not in "!@#$%^&*" for c in password):
+        pool += 33
+    pool_bits = length * math.log2(pool) if pool > 1 else 0.0
+    return min(shannon, pool_bits)
+
+
+def default_pipeline(cache_size=100_000, min_entropy_bits=40):
+    """The six analyzer criteria plus keyboard, run and entropy detectors"""
+    pipeline = RulePipeline(cache_size)
+
+    @pipeline.register("length", cost=1, points=20)
+    def check_length(password, findings):
+        return [] if len(password) >= 8 else ["length"]
+
+    @pipeline.register("character_classes", cost=2, points=20, criteria=4)
+    def check_classes(password, findings):
+        classes = character_classes(password)
+        return [name for name, bit in (("uppercase", UPPERCASE), ("lowercase", LOWERCASE),
+                                       ("number", NUMBER), ("special", SPECIAL))
+                if not classes & bit]
+
+    # Nothing the advisory rules add matters for a known password
+    @pipeline.register("common", cost=5, points=20, stop_on_failure=True)
+    def check_common(password, findings):
+        return ["common"] if is_common_password(password) else []
+
+    @pipeline.register("repeated_run", cost=10)
+    def check_repeated(password, findings):
+        return ["repeated_characters"] if REPEATED_RUN.search(password) else []
+
+    @pipeline.register("sequential_run", cost=20)
+    def check_sequential(password, findings):
+        return ["sequential_characters"] if sequential_run(password) else []
+
+    @pipeline.register("keyboard_walk", cost=30)
+    def check_keyboard(password, findings):
+        return ["keyboard_walk"] if keyboard_walk(password) else []
+
+    @pipeline.register("entropy", cost=40)
+    def check_entropy(password, findings):
+        bits = findings["entropy_bits"] = round(entropy_bits(password), 1)
+        return ["low_entropy"] if bits < min_entropy_bits else []
+
+    return pipeline
@@ -0,0 +1,177 @@
+"""Persistent quiz high scores shared by any number of quiz processes.
+
+Scores are kept in SQLite (standard library) as one row per player,
+category and difficulty holding that player's best score. Recording goes
+through an upsert that keeps the larger score, so two processes finishing
+quizzes at the same time never overwrite each other's results, and only
+the changed rows are written. Recorded scores are buffered and written in
+one transaction per batch.
+
+Each store also keeps the top N of every category and difficulty in a
+bounded min-heap, so recording a score and reading a leaderboard only
+touch those N entries however many players there are.
+
+Usage:
+    python high_scores.py leaderboard scores.db Science easy [--top 10]
+    python high_scores.py bench scores.db [--scores 100000]
+"""
+import argparse
+import heapq
+import random
+import sqlite3
+import sys
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS best_scores (
+    player TEXT NOT NULL,
+    category TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (player, category, difficulty)
+);
+CREATE INDEX IF NOT EXISTS best_scores_rank ON best_scores (category, difficulty, score DESC);
+"""
+
+UPSERT = """
+INSERT INTO best_scores (player, category, difficulty, score, recorded_at) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (player, category, difficulty) DO UPDATE
+SET score = excluded.score, recorded_at = excluded.recorded_at
+WHERE excluded.score > best_scores.score
+"""
+
+
+class HighScoreStore:
+    """Best score per player, category and difficulty, with top-N leaderboards"""
+
+    def __init__(self, path, top_n=10, batch_size=100):
+        self.path = path
+        self.top_n = top_n
+        self.batch_size = batch_size
+        # Other processes may hold the write lock briefly; wait rather than fail
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._pending = []
+        # (category, difficulty) -> min-heap of (score, -recorded_at, player)
+        self._leaders = {}
+
+    def record(self, player, category, difficulty, score):
+        """Buffer a finished quiz's score; it is written with the next batch"""
+        recorded_at = time.time()
+        self._pending.append((player, category, difficulty, score, recorded_at))
+        self._offer(category, difficulty, player, score, recorded_at)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered score in one transaction"""
+        if not self._pending:
+            return
+        with self._db:
+            self._db.executemany(UPSERT, self._pending)
+        self._pending.clear()
+
+    def _heap(self, category, difficulty):
+        heap = self._leaders.get((category, difficulty))
+        if heap is None:
+            rows = self._db.execute(
+                "SELECT score, recorded_at, player FROM best_scores WHERE category = ? AND difficulty = ?"
+                " ORDER BY score DESC, recorded_at LIMIT ?",
+                (category, difficulty, self.top_n),
+            )
+            heap = self._leaders[(category, difficulty)] = [(score, -at, player) for score, at, player in rows]
+            heapq.heapify(heap)
+        return heap
+
+    def _offer(self, category, difficulty, player, score, recorded_at):
+        heap = self._heap(category, difficulty)
+        for i, (old_score, _, old_player) in enumerate(heap):
+            if old_player == player:
+                # A player appears once, with their best score
+                if score > old_score:
+                    heap[i] = (score, -recorded_at, player)
+                    heapq.heapify(heap)
+                return
+        entry = (score, -recorded_at, player)
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def leaderboard(self, category, difficulty):
+        """Top scores as [(player, score)], best first; earlier scores win ties"""
+        return [(player, score) for score, _, player in sorted(self._heap(category, difficulty), reverse=True)]
+
+    def refresh(self):
+        """Forget the cached leaderboards so they include other processes' scores"""
+        self.flush()
+        self._leaders.clear()
+
+    def personal_bests(self, player):
+        """{category: {difficulty: score}} of one player's saved bests"""
+        self.flush()
+        bests = {}
+        rows = self._db.execute(
+            "SELECT category, difficulty, score FROM best_scores WHERE player = ?", (player,))
+        for category, difficulty, score in rows:
+            bests.setdefault(category, {})[difficulty] = score
+        return bests
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def bench(path, count):
+    players = [f"player{i}" for i in range(count // 10 or 1)]
+    with HighScoreStore(path) as store:
+        start = time.perf_counter()
+        for _ in range(count):
+            store.record(random.choice(players), random.choice(["Science", "History"]),
+                         random.choice(["easy", "hard"]), random.randrange(0, 101, 10))
+        store.flush()
+        elapsed = time.perf_counter() - start
+        print(f"Recorded {count:,} scores in {elapsed:.2f}s ({count / elapsed:,.0f}/s)")
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            store.leaderboard("Science", "easy")
+        print(f"Leaderboard read in {(time.perf_counter() - start) * 1000:.1f} us on average")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Persistent quiz high scores")
+    commands = parser.add_subparsers(dest="command", required=True)
+    leaderboard = commands.add_parser("leaderboard", help="print the top scores of a quiz")
+    leaderboard.add_argument("database")
+    leaderboard.add_argument("category")
+    leaderboard.add_argument("difficulty")
+    leaderboard.add_argument("--top", type=int, default=10)
+    bench_command = commands.add_parser("bench", help="time recording and leaderboard reads")
+    bench_command.add_argument("database")
+    bench_command.add_argument("--scores", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    if args.command == "leaderboard":
+        with HighScoreStore(args.database, top_n=args.top) as store:
+            board = store.leaderboard(args.category.title(), args.difficulty.lower())
+        if not board:
+            print("No scores yet.")
+        for rank, (player, score) in enumerate(board, 1):
+            print(f"{rank}. {player}: {score}")
+    else:
+        bench(args.database, args.scores)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""Question banks kept on disk and sampled through an offset index.
+
+A bank is a JSON-lines file with one question per line:
+
+    {"category": "Science", "difficulty": "easy", "question": "...",
+     "options": ["H2O", "CO2", "NaCl", "O2"], "answer": 0}
+
+Next to it, bank.jsonl.idx records where every question starts, grouped
+by category and difficulty:
+
+    header     magic, size and modification time (ns) of the bank it
+               indexes, directory length
+    directory  JSON {category: {difficulty: [first offset, count]}}
+    offsets    little-endian uint64 byte offsets into the bank
+
+Opening a bank only reads the header and the directory, and both files are
+memory mapped, so startup does not depend on how many questions there
+are. Sampling k questions draws k distinct positions and parses only
+those k lines.
+
+Usage:
+    python question_bank.py convert questions.json bank.jsonl
+    python question_bank.py index bank.jsonl
+    python question_bank.py sample bank.jsonl Science easy 5
+    python question_bank.py bench --questions 500000
+"""
+import argparse
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+HEADER = struct.Struct("<8sQQQ")
+MAGIC = b"QBINDEX2"
+
+
+def check_question(question):
+    """Raise ValueError unless question can be asked by run_quiz"""
+    if not isinstance(question.get("question"), str):
+        raise ValueError("question text must be a string")
+    options = question.get("options")
+    if not isinstance(options, list) or len(options) != 4:
+        raise ValueError("every question needs exactly four options")
+    if question.get("answer") not in range(4):
+        raise ValueError("answer must be the index of one of the options")
+
+
+class MemoryBank:
+    """Bank over a nested {category: {difficulty: [questions]}} dict like quiz_data"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def categories(self):
+        return list(self.data)
+
+    def count(self, category, difficulty):
+        return len(self.data.get(category, {}).get(difficulty, []))
+
+    def questions(self, category, difficulty):
+        """Every question of a category and difficulty, in bank order"""
+        return list(self.data.get(category, {}).get(difficulty, []))
+
+    def sample(self, category, difficulty, k):
+        """Up to k distinct questions in random order"""
+        questions = self.data.get(category, {}).get(difficulty, [])
+        return random.sample(questions, min(k, len(questions)))
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class QuestionBank(MemoryBank):
+    """Read-only bank backed by a JSON-lines file and its offset index"""
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self.index_path = index_path or path + ".idx"
+        if not _index_is_current(path, self.index_path):
+            build_index(path, self.index_path)
+
+        self._bank_file = open(path, "rb")
+        # An empty file cannot be mapped; its index has no questions to read anyway
+        if os.fstat(self._bank_file.fileno()).st_size:
+            self._bank = mmap.mmap(self._bank_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index_file = open(self.index_path, "rb")
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, _, directory_length = HEADER.unpack_from(self._index)
+        self.directory = json.loads(self._index[HEADER.size:HEADER.size + directory_length])
+        self._offsets = memoryview(self._index)[_offsets_start(directory_length):].cast("Q")
+
+    def categories(self):
+        return list(self.directory)
+
+    def count(self, category, difficulty):
+        return self.directory.get(category, {}).get(difficulty, (0, 0))[1]
+
+    def _question(self, position):
+        start = self._offsets[position]
+        end = self._bank.find(b"\n", start)
+        return json.loads(self._bank[start:end if end >= 0 else len(self._bank)])
+
+    def questions(self, category, difficulty):
+        first, count = self.directory.get(category, {}).get(difficulty, (0, 0))
+        return [self._question(first + i) for i in range(count)]
+
+    def sample(self, category, difficulty, k):
+        first, count = self.directory.get(category, {}).get(difficulty, (0, 0))
+        # Sampling a range picks k positions without building the range
+        positions = random.sample(range(first, first + count), min(k, count))
+        return [self._question(position) for position in positions]
+
+    def close(self):
+        if getattr(self, "_offsets", None) is not None:
+            self._offsets.release()
+        for handle in ("_index", "_index_file", "_bank", "_bank_file"):
+            if hasattr(self, handle):
+                getattr(self, handle).close()
+
+
+def _offsets_start(directory_length):
+    """Offsets start at the first multiple of 8 after the directory"""
+    return (HEADER.size + directory_length + 7) // 8 * 8
+
+
+def _index_is_current(path, index_path):
+    """Whether the index was built from the bank as it is now: same size and mtime"""
+    try:
+        with open(index_path, "rb") as index:
+            magic, bank_size, bank_mtime, _ = HEADER.unpack(index.read(HEADER.size))
+        stat = os.stat(path)
+    except (OSError, struct.error):
+        return False
+    return magic == MAGIC and (bank_size, bank_mtime) == (stat.st_size, stat.st_mtime_ns)
+
+
+def build_index(path, index_path=None):
+    """Index a JSON-lines bank in one pass, returning the number of questions.
+
+    Raises ValueError naming the line of the first malformed question.
+    """
+    index_path = index_path or path + ".idx"
+    groups = {}
+    offset = 0
+    with open(path, "rb") as bank:
+        # Taken before reading, so an edit made while indexing means a rebuild
+        bank_mtime = os.fstat(bank.fileno()).st_mtime_ns
+        for line_number, line in enumerate(bank, 1):
+            if line.strip():
+                try:
+                    question = json.loads(line)
+                    check_question(question)
+                    key = (question["category"], question["difficulty"])
+                except (ValueError, KeyError, TypeError, AttributeError) as error:
+                    raise ValueError(f"{path}:{line_number}: {error}") from None
+                groups.setdefault(key, array("Q")).append(offset)
+            offset += len(line)
+
+    directory = {}
+    first = 0
+    for (category, difficulty), offsets in groups.items():
+        directory.setdefault(category, {})[difficulty] = [first, len(offsets)]
+        first += len(offsets)
+    encoded = json.dumps(directory).encode("utf-8")
+
+    temp_path = index_path + ".tmp"
+    with open(temp_path, "wb") as index:
+        index.write(HEADER.pack(MAGIC, offset, bank_mtime, len(encoded)))
+        index.write(encoded)
+        index.write(bytes(_offsets_start(len(encoded)) - HEADER.size - len(encoded)))
+        for offsets in groups.values():
+            offsets.tofile(index)
+    os.replace(temp_path, index_path)
+    return first
+
+
+def convert(source_path, bank_path):
+    """Write a nested JSON question file (shaped like quiz_data) as an indexed bank"""
+    with open(source_path, encoding="utf-8") as source:
+        data = json.load(source)
+    with open(bank_path, "w", encoding="utf-8") as bank:
+        for category, difficulties in data.items():
+            for difficulty, questions in difficulties.items():
+                for question in questions:
+                    check_question(question)
+                    bank.write(json.dumps({"category": category, "difficulty": difficulty, **question}) + "\n")
+    return build_index(bank_path)
+
+
+def open_bank(path):
+    """Open a bank file: .json files are loaded whole, anything else is indexed"""
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as source:
+            return MemoryBank(json.load(source))
+    return QuestionBank(path)
+
+
+def bench(count, k):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bank.jsonl")
+        with open(path, "w", encoding="utf-8") as bank:
+            for i in range(count):
+                bank.write(json.dumps({
+                    "category": ("Science", "History", "Geography")[i % 3],
+                    "difficulty": ("easy", "hard")[i // 3 % 2],
+                    "question": f"Synthetic question {i}?",
+                    "options": ["A", "B", "C", "D"],
+                    "answer": i % 4,
+                }) + "\n")
+
+        start = time.perf_counter()
+        build_index(path)
+        print(f"Indexed {count:,} questions in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        bank = QuestionBank(path)
+        print(f"Opened bank in {(time.perf_counter() - start) * 1000:.2f} ms")
+        with bank:
+            rounds = 1000
+            start = time.perf_counter()
+            for _ in range(rounds):
+                bank.sample("Science", "easy", k)
+            print(f"Sampled {k} questions in {(time.perf_counter() - start) / rounds * 1e6:.0f} us on average")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Indexed quiz question banks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert_command = commands.add_parser("convert", help="turn a nested JSON file into an indexed bank")
+    convert_command.add_argument("source")
+    convert_command.add_argument("bank")
+    index_command = commands.add_parser("index", help="(re)build the index of a JSON-lines bank")
+    index_command.add_argument("bank")
+    sample_command = commands.add_parser("sample", help="print random questions from a bank")
+    sample_command.add_argument("bank")
+    sample_command.add_argument("category")
+    sample_command.add_argument("difficulty")
+    sample_command.add_argument("k", type=int)
+    bench_command = commands.add_parser("bench", help="time indexing, opening and sampling")
+    bench_command.add_argument("--questions", type=int, default=500_000)
+    bench_command.add_argument("-k", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "convert":
+            print(f"Wrote {convert(args.source, args.bank):,} questions to {args.bank}")
+        elif args.command == "index":
+            print(f"Indexed {build_index(args.bank):,} questions")
+        elif args.command == "sample":
+            with open_bank(args.bank) as bank:
+                for question in bank.sample(args.category, args.difficulty, args.k):
+                    print(question["question"])
+        else:
+            bench(args.questions, args.k)
+    except ValueError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""Response-time analytics for quiz questions.
+
+Every answer is folded into running aggregates per question, category,
+difficulty and category/difficulty pair: attempts, correct answers, total
+time and a quantile sketch of the answer times. The sketch keeps one
+counter per logarithmic bucket, so any quantile it reports is within 1%
+of the true value while memory depends on the spread of the times, not on
+how many answers there were. Sketches of the same accuracy merge exactly,
+so stats files from many quiz processes can be combined, and any number of
+quiz processes can add their answers to one shared stats file.
+
+Usage:
+    python quiz_analytics.py report stats.json [--by question] [--sort p90] [--top 10]
+    python quiz_analytics.py export stats.json stats.csv
+    python quiz_analytics.py merge combined.json stats1.json stats2.json ...
+    python quiz_analytics.py bench [--attempts 1000000]
+"""
+import argparse
+import csv
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: adds are still atomic, just not serialized
+    fcntl = None
+
+from arena.durable_log import write_atomically
+
+GROUPS = ("question", "category", "difficulty", "quiz")
+QUANTILES = (50, 90, 99)
+
+
+@contextmanager
+def _locked(path):
+    """Hold an exclusive lock on path's ".lock" file"""
+    with open(path + ".lock", "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield  # closing the file releases the lock
+
+
+class QuantileSketch:
+    """Relative-error quantile sketch over positive values (DDSketch style)"""
+
+    __slots__ = ("relative_accuracy", "_gamma_log", "buckets", "zeros", "count")
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self._gamma_log = math.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        # bucket i counts values in (gamma ** (i - 1), gamma ** i]
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+
+    def bucket(self, value):
+        """Bucket a value falls in, or None for zero and negative values"""
+        return math.ceil(math.log(value) / self._gamma_log) if value > 0 else None
+
+    def add(self, value, bucket=False):
+        """Count a value; a bucket computed by bucket() may be passed to skip the log"""
+        if bucket is False:
+            bucket = self.bucket(value)
+        self.count += 1
+        if bucket is None:
+            self.zeros += 1
+        else:
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("only sketches with the same accuracy can be merged")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def quantile(self, percent):
+        """Value at the given percentile, or None when the sketch is empty"""
+        if not self.count:
+            return None
+        rank = percent / 100 * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                # The midpoint that keeps the relative error of the bucket lowest
+                return 2 * math.exp(key * self._gamma_log) / (1 + math.exp(self._gamma_log))
+        return None
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zeros": self.zeros,
+            "buckets": {str(key): count for key, count in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"])
+        sketch.zeros = data["zeros"]
+        sketch.buckets = {int(key): count for key, count in data["buckets"].items()}
+        sketch.count = sketch.zeros + sum(sketch.buckets.values())
+        return sketch
+
+
+class AnswerStats:
+    """Aggregates of every answer to one question, category or difficulty"""
+
+    __slots__ = ("attempts", "correct", "total_time", "sketch")
+
+    def __init__(self, relative_accuracy=0.01):
+        self.attempts = 0
+        self.correct = 0
+        self.total_time = 0.0
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, answer_time, correct, bucket=False):
+        self.attempts += 1
+        self.correct += correct
+        self.total_time += answer_time
+        self.sketch.add(answer_time, bucket)
+
+    def merge(self, other):
+        self.attempts += other.attempts
+        self.correct += other.correct
+        self.total_time += other.total_time
+        self.sketch.merge(other.sketch)
+
+    def summary(self):
+        summary = {
+            "attempts": self.attempts,
+            "accuracy": self.correct / self.attempts if self.attempts else 0.0,
+            "mean": self.total_time / self.attempts if self.attempts else 0.0,
+        }
+        for percent in QUANTILES:
+            summary[f"p{percent}"] = self.sketch.quantile(percent) or 0.0
+        return summary
+
+
+class QuizAnalytics:
+    """Answer-time and accuracy aggregates for every question and quiz"""
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.groups = {group: {} for group in GROUPS}
+        # Buckets only depend on the accuracy, so one sketch computes them for all
+        self._bucketer = QuantileSketch(relative_accuracy)
+
+    def _stats(self, group, key):
+        stats = self.groups[group].get(key)
+        if stats is None:
+            stats = self.groups[group][key] = AnswerStats(self.relative_accuracy)
+        return stats
+
+    def record(self, category, difficulty, question, answer_time, correct):
+        """Fold one answer into the aggregates; run_quiz calls this through on_answer"""
+        correct = bool(correct)
+        bucket = self._bucketer.bucket(answer_time)
+        quiz = f"{category}/{difficulty}"
+        self._stats("question", f"{quiz}/{question}").add(answer_time, correct, bucket)
+        self._stats("category", category).add(answer_time, correct, bucket)
+        self._stats("difficulty", difficulty).add(answer_time, correct, bucket)
+        self._stats("quiz", quiz).add(answer_time, correct, bucket)
+
+    def merge(self, other):
+        for group in GROUPS:
+            for key, stats in other.groups[group].items():
+                self._stats(group, key).merge(stats)
+
+    def report(self, group, sort="p90", top=None):
+        """[(key, summary)] of one group, slowest (or highest by sort) first"""
+        rows = [(key, stats.summary()) for key, stats in self.groups[group].items()]
+        rows.sort(key=lambda row: row[1][sort], reverse=True)
+        return rows[:top] if top else rows
+
+    def save(self, path):
+        """Write the aggregates to a JSON file, replacing it atomically"""
+        data = {
+            "relative_accuracy": self.relative_accuracy,
+            "groups": {
+                group: {
+                    key: [stats.attempts, stats.correct, stats.total_time, stats.sketch.to_dict()]
+                    for key, stats in entries.items()
+                }
+                for group, entries in self.groups.items()
+            },
+        }
+        write_atomically(path, lambda file: file.write(json.dumps(data).encode("utf-8")))
+
+    def add_to(self, path):
+        """Add these aggregates to the stats file at path, then start over empty.
+
+        The file is re-read and merged under a lock and replaced atomically,
+        so processes sharing one file never overwrite each other's answers.
+        """
+        with _locked(path):
+            combined = QuizAnalytics.load(path)
+            combined.merge(self)
+            combined.save(path)
+        self.groups = {group: {} for group in GROUPS}
+
+    @classmethod
+    def load(cls, path):
+        """Aggregates saved by save(), or empty ones if the file does not exist"""
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return cls()
+        analytics = cls(data["relative_accuracy"])
+        for group, entries in data["groups"].items():
+            for key, (attempts, correct, total_time, sketch) in entries.items():
+                stats = analytics._stats(group, key)
+                stats.attempts, stats.correct, stats.total_time = attempts, correct, total_time
+                stats.sketch = QuantileSketch.from_dict(sketch)
+        return analytics
+
+
+def print_report(analytics, group, sort, top):
+    rows = analytics.report(group, sort, top)
+    if not rows:
+        print("No answers recorded yet.")
+        return
+    print(f"{group.title():<50} {'Attempts':>10} {'Correct':>8} {'Mean':>7} {'p50':>7} {'p90':>7} {'p99':>7}")
+    for key, summary in rows:
+        print(f"{key[:50]:<50} {summary['attempts']:>10,} {summary['accuracy']:>8.0%} {summary['mean']:>6.1f}s"
+              f" {summary['p50']:>6.1f}s {summary['p90']:>6.1f}s {summary['p99']:>6.1f}s")
+
+
+def export_csv(analytics, path):
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["group", "key", "attempts", "accuracy", "mean", "p50", "p90", "p99"])
+        for group in GROUPS:
+            for key, summary in analytics.report(group, "attempts"):
+                writer.writerow([group, key, summary["attempts"], f"{summary['accuracy']:.4f}",
+                                 f"{summary['mean']:.3f}", f"{summary['p50']:.3f}",
+                                 f"{summary['p90']:.3f}", f"{summary['p99']:.3f}"])
+
+
+def bench(attempts):
+    questions = [(category, difficulty, f"Question {i}")
+                 for category in ("Science", "History") for difficulty in ("easy", "hard") for i in range(50)]
+    answers = [(random.choice(questions), random.lognormvariate(1.5, 0.6)) for _ in range(attempts)]
+
+    def record_all():
+        analytics = QuizAnalytics()
+        for (category, difficulty, question), answer_time in answers:
+            analytics.record(category, difficulty, question, answer_time, answer_time < 5)
+        return analytics
+
+    start = time.perf_counter()
+    analytics = record_all()
+    elapsed = time.perf_counter() - start
+    # Measured in a second run, since tracing allocations slows recording down
+    tracemalloc.start()
+    second_run = record_all()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del second_run
+
+    times = sorted(answer_time for _, answer_time in answers)
+    print(f"Recorded {attempts:,} answers in {elapsed:.2f}s ({attempts / elapsed:,.0f}/s), {size / 1024:,.0f} KiB of aggregates")
+    summary = analytics.groups["difficulty"]["easy"].summary()
+    overall = QuantileSketch()
+    for stats in analytics.groups["difficulty"].values():
+        overall.merge(stats.sketch)
+    for percent in QUANTILES:
+        exact = times[round(percent / 100 * (len(times) - 1))]
+        print(f"p{percent}: sketch {overall.quantile(percent):.3f}s, exact {exact:.3f}s"
+              f" (easy questions: {summary[f'p{percent}']:.3f}s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quiz answer-time analytics")
+    commands = parser.add_subparsers(dest="command", required=True)
+    report = commands.add_parser("report", help="print per-question or per-quiz statistics")
+    report.add_argument("stats")
+    report.add_argument("--by", choices=GROUPS, default="question")
+    report.add_argument("--sort", choices=["attempts", "accuracy", "mean", "p50", "p90", "p99"], default="p90")
+    report.add_argument("--top", type=int, default=20)
+    export = commands.add_parser("export", help="write every statistic to a CSV file")
+    export.add_argument("stats")
+    export.add_argument("output")
+    merge = commands.add_parser("merge", help="combine stats files from several processes")
+    merge.add_argument("output")
+    merge.add_argument("inputs", nargs="+")
+    bench_command = commands.add_parser("bench", help="time recording and check quantile accuracy")
+    bench_command.add_argument("--attempts", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    if args.command == "report":
+        print_report(QuizAnalytics.load(args.stats), args.by, args.sort, args.top)
+    elif args.command == "export":
+        export_csv(QuizAnalytics.load(args.stats), args.output)
+    elif args.command == "merge":
+        combined = QuizAnalytics.load(args.inputs[0])
+        for path in args.inputs[1:]:
+            combined.merge(QuizAnalytics.load(path))
+        combined.save(args.output)
+    else:
+        bench(args.attempts)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
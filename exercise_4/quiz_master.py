@@ -1,5 +1,11 @@
+import argparse
+import getpass
 import time
 
+from high_scores import HighScoreStore
+from question_bank import MemoryBank, open_bank
+from quiz_analytics import QuizAnalytics
+
 # Quiz data structure
 quiz_data = {
     "Science": {
@@ -42,10 +48,11 @@ quiz_data = {
 }
 
 
-def initialize_high_scores():
+def initialize_high_scores(bank=None):
     """Initialize high scores dictionary without using lambda"""
+    bank = bank or MemoryBank(quiz_data)
     high_scores = {}
-    for category in quiz_data:
+    for category in bank.categories():
         high_scores[category] = {"easy": 0, "hard": 0}
     return high_scores
 
@@ -54,19 +61,22 @@ def display_progress(current, total):
     progress = int((current / total) * 10)
     print(f"[{'█' * progress}{'░' * (10 - progress)}] {current/total*100:.0f}% Complete\n")
 
-def show_categories():
+def show_categories(bank=None):
     """Display available categories"""
+    bank = bank or MemoryBank(quiz_data)
     print("\n=== QUIZ MASTER ===")
-    print("Categories:", ", ".join(quiz_data.keys()))
+    print("Categories:", ", ".join(bank.categories()))
     print()
 
-def select_category_difficulty():
+def select_category_difficulty(bank=None):
     """Get user selection for category and difficulty"""
+    bank = bank or MemoryBank(quiz_data)
+    categories = bank.categories()
     while True:
         category = input("Choose a category: ").title()
-        if category in quiz_data:
+        if category in categories:
             break
-        print("Invalid category. Please choose from:", ", ".join(quiz_data.keys()))
+        print("Invalid category. Please choose from:", ", ".join(categories))
     
     while True:
         difficulty = input("Choose difficulty (easy/hard): ").lower()
@@ -76,9 +86,21 @@ def select_category_difficulty():
     
     return category, difficulty
 
-def run_quiz(category, difficulty, high_scores):
-    """Run the quiz and track scores"""
-    questions = quiz_data[category][difficulty]
+def run_quiz(category, difficulty, high_scores, bank=None, count=None, on_answer=None):
+    """Run the quiz, track scores and return the final score.
+
+    With count, that many random questions are asked instead of all of them.
+    on_answer(category, difficulty, question, answer_time, correct) is
+    called after every answer, e.g. with QuizAnalytics.record.
+    """
+    bank = bank or MemoryBank(quiz_data)
+    if count is None:
+        questions = bank.questions(category, difficulty)
+    else:
+        questions = bank.sample(category, difficulty, count)
+    if not questions:
+        print(f"\nNo {difficulty} questions in {category} yet.")
+        return None
     score = 0
     wrong_answers = []
     
@@ -100,6 +122,8 @@ def run_quiz(category, difficulty, high_scores):
         
         answer_time = time.time() - start_time
         user_index = ord(user_answer) - 65
+        if on_answer is not None:
+            on_answer(category, difficulty, question['question'], answer_time, user_index == question['answer'])
         
         if user_index == question['answer']:
             print(f"\n✅ Correct! (+{10} points)")
@@ -135,15 +159,50 @@ def run_quiz(category, difficulty, high_scores):
             print(f"\n{i}. {wrong['question']}")
             print(f"Your answer: {wrong['your_answer']}) {wrong['options'][ord(wrong['your_answer']) - 65]}")
             print(f"Correct answer: {wrong['correct_answer']}) {wrong['options'][ord(wrong['correct_answer']) - 65]}")
+    return final_score
+
+def display_leaderboard(store, category, difficulty, top=5):
+    """Show the best saved scores of a quiz"""
+    print(f"\nLEADERBOARD: {category} ({difficulty.capitalize()})")
+    for rank, (player, score) in enumerate(store.leaderboard(category, difficulty)[:top], 1):
+        print(f"{rank}. {player}: {score}")
+
+def default_player():
+    """Login name to save high scores under, or "player" when there is none"""
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return "player"
 
 def main():
     """Main program loop"""
-    high_scores = initialize_high_scores()
+    parser = argparse.ArgumentParser(description="Quiz Master")
+    parser.add_argument("--bank", help="question bank: a .json file shaped like quiz_data or an indexed .jsonl bank")
+    parser.add_argument("--questions", type=int, help="ask this many random questions per quiz")
+    parser.add_argument("--scores", help="save high scores to this database, e.g. quiz_scores.db")
+    parser.add_argument("--player", help="name to save high scores under (default: your login name)")
+    parser.add_argument("--analytics", help="add answer times to this stats file (see quiz_analytics.py)")
+    args = parser.parse_args()
+
+    bank = open_bank(args.bank) if args.bank else MemoryBank(quiz_data)
+    store = HighScoreStore(args.scores) if args.scores else None
+    player = (args.player or default_player()) if store else None
+    # Only this session's answers; they are added to the file on exit
+    analytics = QuizAnalytics() if args.analytics else None
+    high_scores = initialize_high_scores(bank)
+    if store:
+        for category, scores in store.personal_bests(player).items():
+            if category in high_scores:
+                high_scores[category].update(scores)
     
-    show_categories()
+    show_categories(bank)
     while True:
-        category, difficulty = select_category_difficulty()
-        run_quiz(category, difficulty, high_scores)
+        category, difficulty = select_category_difficulty(bank)
+        final_score = run_quiz(category, difficulty, high_scores, bank, args.questions,
+                               analytics.record if analytics else None)
+        if final_score is not None and store:
+            store.record(player, category, difficulty, final_score)
+            display_leaderboard(store, category, difficulty)
         
         if input("\nTake another quiz? (y/n): ").lower() != 'y':
             print("\nSession high scores:")
@@ -151,6 +210,11 @@ def main():
                 print(f"{category}: Easy - {scores['easy']}, Hard - {scores['hard']}")
             print("Goodbye!")
             break
+    if analytics:
+        analytics.add_to(args.analytics)
+    if store:
+        store.close()
+    bank.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
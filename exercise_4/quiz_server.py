@@ -0,0 +1,307 @@
+"""Multi-player quiz server over a JSON-lines TCP protocol (standard library only).
+
+Every request is one JSON object on its own line and gets one JSON line back:
+
+    {"op": "categories"}
+    {"op": "start", "category": "Science", "difficulty": "easy", "questions": 5}
+    {"op": "answer", "answer": "B"}
+    {"op": "leaderboard", "category": "Science", "difficulty": "easy"}
+
+"start" replies with the first question and every "answer" reply carries
+the next one, until the last answer, whose reply has the final score and
+the review of wrong answers that run_quiz prints. "questions" is optional;
+without it the whole category is asked in order, as run_quiz does.
+"start" may also name a "player"; with --scores, every finished quiz is
+saved to that high score database under the player's name. With
+--analytics, every answer time is also added to a stats file that is
+saved every few seconds (see quiz_analytics.py). The high score
+database is only used from its own thread, so a slow SQLite write never
+holds up the event loop.
+
+Each connection plays one quiz at a time. Its state is a small slotted
+object pointing into the shared question bank, so thousands of sessions
+fit in one process, and answer times are measured with time.time() from
+the moment a question is sent, as run_quiz measures them.
+
+Usage:
+    python quiz_server.py serve [--port 8766] [--bank bank.jsonl] [--scores scores.db]
+                                 [--analytics stats.json]
+    python quiz_server.py bench [--port 8766] [--clients 500] [--sessions 20]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from arena.jsonlines import print_latencies, run_clients, send_request, serve_lines
+from high_scores import HighScoreStore
+from question_bank import MemoryBank, open_bank
+from quiz_analytics import QuizAnalytics
+from quiz_master import initialize_high_scores, quiz_data
+
+DEFAULT_PORT = 8766
+LETTERS = "ABCD"
+
+
+class QuizSession:
+    """Progress of one quiz: the questions, answers given so far and timing"""
+
+    __slots__ = ("player", "category", "difficulty", "questions", "answers", "score", "asked_at")
+
+    def __init__(self, player, category, difficulty, questions):
+        self.player = player
+        self.category = category
+        self.difficulty = difficulty
+        self.questions = questions
+        # One byte per answered question: the index of the chosen option
+        self.answers = bytearray()
+        self.score = 0
+        self.asked_at = 0.0
+
+    @property
+    def finished(self):
+        return len(self.answers) == len(self.questions)
+
+    def next_question(self):
+        question = self.questions[len(self.answers)]
+        self.asked_at = time.time()
+        return {
+            "number": len(self.answers) + 1,
+            "total": len(self.questions),
+            "question": question["question"],
+            "options": question["options"],
+        }
+
+    def answer(self, letter):
+        question = self.questions[len(self.answers)]
+        answer_time = time.time() - self.asked_at
+        user_index = LETTERS.index(letter)
+        self.answers.append(user_index)
+        correct = user_index == question["answer"]
+        if correct:
+            self.score += 10
+        return {
+            "correct": correct,
+            "correct_answer": LETTERS[question["answer"]],
+            "time": round(answer_time, 3),
+            "score": self.score,
+        }
+
+    def wrong_answers(self):
+        return [
+            {
+                "question": question["question"],
+                "your_answer": LETTERS[user_index],
+                "correct_answer": LETTERS[question["answer"]],
+                "options": question["options"],
+            }
+            for question, user_index in zip(self.questions, self.answers)
+            if user_index != question["answer"]
+        ]
+
+
+class QuizServer:
+    """Serves quizzes from one shared bank to any number of connections"""
+
+    def __init__(self, bank, store=None, analytics=None, store_thread=None):
+        self.bank = bank
+        self.store = store
+        self.analytics = analytics
+        # Executor the store was opened on; every store call runs there
+        self.store_thread = store_thread
+        self.high_scores = initialize_high_scores(bank)
+
+    async def call_store(self, method, *args):
+        """Run a HighScoreStore method on the store's thread, off the event loop"""
+        if self.store_thread is None:
+            return method(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.store_thread, method, *args)
+
+    def start(self, player, category, difficulty, count=None):
+        category = category.strip().title()
+        difficulty = difficulty.strip().lower()
+        if category not in self.high_scores:
+            return None, {"ok": False, "error": f"Invalid category. Please choose from: {', '.join(self.high_scores)}"}
+        if difficulty not in ("easy", "hard"):
+            return None, {"ok": False, "error": "Please enter either 'easy' or 'hard'"}
+        if count is None:
+            questions = self.bank.questions(category, difficulty)
+        else:
+            questions = self.bank.sample(category, difficulty, count)
+        if not questions:
+            return None, {"ok": False, "error": f"No {difficulty} questions in {category} yet."}
+        session = QuizSession(player, category, difficulty, questions)
+        return session, {"ok": True, "question": session.next_question()}
+
+    async def answer(self, session, letter):
+        if session is None:
+            return {"ok": False, "error": "No quiz in progress; send a start request first."}
+        letter = str(letter).strip().upper()
+        if len(letter) != 1 or letter not in LETTERS:
+            return {"ok": False, "error": "Please enter A, B, C, or D"}
+        reply = {"ok": True, **session.answer(letter)}
+        if self.analytics is not None:
+            question = session.questions[len(session.answers) - 1]
+            self.analytics.record(session.category, session.difficulty, question["question"],
+                                  reply["time"], reply["correct"])
+        if not session.finished:
+            reply["question"] = session.next_question()
+            return reply
+
+        if self.store is not None:
+            await self.call_store(self.store.record, session.player, session.category,
+                                  session.difficulty, session.score)
+        scores = self.high_scores[session.category]
+        reply["new_best"] = session.score > scores[session.difficulty]
+        if reply["new_best"]:
+            scores[session.difficulty] = session.score
+        reply["final"] = {
+            "score": session.score,
+            "total_possible": len(session.questions) * 10,
+            "wrong_answers": session.wrong_answers(),
+        }
+        return reply
+
+    async def handle(self, session, request):
+        """Dispatch one request, returning (session, reply)"""
+        op = request.get("op")
+        try:
+            if op == "categories":
+                return session, {"ok": True, "categories": self.bank.categories()}
+            if op == "start":
+                count = request.get("questions")
+                new_session, reply = self.start(str(request.get("player", "anonymous")),
+                                                request["category"], request["difficulty"],
+                                                None if count is None else int(count))
+                return (new_session or session), reply
+            if op == "answer":
+                reply = await self.answer(session, request["answer"])
+                return (None if session is not None and session.finished else session), reply
+            if op == "leaderboard":
+                if self.store is None:
+                    return session, {"ok": False, "error": "High scores are not being saved."}
+                board = await self.call_store(self.store.leaderboard, request["category"].strip().title(),
+                                              request["difficulty"].strip().lower())
+                return session, {"ok": True, "leaderboard": [list(entry) for entry in board]}
+        except KeyError as missing:
+            return session, {"ok": False, "error": f"Missing field: {missing.args[0]}"}
+        except (TypeError, ValueError, AttributeError):
+            return session, {"ok": False, "error": "Invalid input! Please check the request fields."}
+        return session, {"ok": False, "error": f"Unknown operation: {op}"}
+
+    async def serve_client(self, reader, writer):
+        session = None
+
+        async def handle(request):
+            nonlocal session
+            session, reply = await self.handle(session, request)
+            return reply
+
+        await serve_lines(reader, writer, handle)
+
+
+async def _every(interval, function):
+    """Await function() once per interval, e.g. to write buffered scores even when few arrive"""
+    while True:
+        await asyncio.sleep(interval)
+        await function()
+
+
+async def serve(host, port, bank, scores_path=None, analytics_path=None):
+    loop = asyncio.get_running_loop()
+    # Answers since the last save; each save adds them to the shared file
+    analytics = QuizAnalytics() if analytics_path else None
+    # SQLite connections belong to the thread that opened them, so the store
+    # is opened, used and closed on this one thread
+    store_thread = ThreadPoolExecutor(max_workers=1) if scores_path else None
+    store = await loop.run_in_executor(store_thread, HighScoreStore, scores_path) if scores_path else None
+    quiz_server = QuizServer(bank, store, analytics, store_thread)
+    server = await asyncio.start_server(quiz_server.serve_client, host, port)
+    print(f"Quiz server listening on {host}:{port}")
+    tasks = []
+    if store:
+        tasks.append(asyncio.create_task(_every(1.0, lambda: quiz_server.call_store(store.flush))))
+    if analytics:
+        async def save_analytics():
+            analytics.add_to(analytics_path)
+        tasks.append(asyncio.create_task(_every(10.0, save_analytics)))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        for task in tasks:
+            task.cancel()
+        if analytics:
+            analytics.add_to(analytics_path)
+        if store:
+            # Blocks until every queued store call has run, then closes on the same thread
+            store_thread.submit(store.close).result()
+            store_thread.shutdown()
+
+
+async def _bench_client(host, port, sessions, questions, categories, latencies):
+    """Play sessions quizzes, returning how many of them actually started"""
+    reader, writer = await asyncio.open_connection(host, port)
+    started = 0
+    try:
+        for _ in range(sessions):
+            reply = await send_request(reader, writer, {
+                "op": "start", "player": f"bench{random.randrange(1000)}", "category": random.choice(categories),
+                "difficulty": random.choice(["easy", "hard"]), "questions": questions,
+            })
+            started += reply.get("ok", False)
+            while reply.get("question"):
+                start = time.perf_counter()
+                reply = await send_request(reader, writer, {"op": "answer", "answer": random.choice(LETTERS)})
+                latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+    return started
+
+
+async def bench(host, port, clients, sessions, questions):
+    """Play many quizzes at once and report session throughput and answer latency"""
+    reader, writer = await asyncio.open_connection(host, port)
+    categories = (await send_request(reader, writer, {"op": "categories"}))["categories"]
+    writer.close()
+
+    latencies, elapsed, started = await run_clients(
+        clients, lambda latencies: _bench_client(host, port, sessions, questions, categories, latencies))
+    played = sum(started)
+    print(f"Sessions: {played:,} of {clients * sessions:,} started, from {clients} clients in {elapsed:.2f}s")
+    print(f"Throughput: {played / elapsed:,.0f} sessions/s, {len(latencies) / elapsed:,.0f} answers/s")
+    print_latencies(latencies)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-player quiz server")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_command = commands.add_parser("serve", help="run the server")
+    serve_command.add_argument("--bank", help="question bank (default: the built-in quiz_data)")
+    serve_command.add_argument("--scores", help="save finished quizzes to this high score database")
+    serve_command.add_argument("--analytics", help="add answer times to this stats file")
+    bench_command = commands.add_parser("bench", help="load-test a running server")
+    bench_command.add_argument("--clients", type=int, default=500)
+    bench_command.add_argument("--sessions", type=int, default=20, help="quizzes per client")
+    bench_command.add_argument("--questions", type=int, default=5, help="questions per quiz")
+    for command in (serve_command, bench_command):
+        command.add_argument("--host", default="127.0.0.1")
+        command.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "serve":
+            bank = open_bank(args.bank) if args.bank else MemoryBank(quiz_data)
+            with bank:
+                asyncio.run(serve(args.host, args.port, bank, args.scores, args.analytics))
+        else:
+            asyncio.run(bench(args.host, args.port, args.clients, args.sessions, args.questions))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
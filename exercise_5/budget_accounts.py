@@ -0,0 +1,241 @@
+"""Monthly summaries for many accounts at once, across a process pool.
+
+Every account is a ledger file written by BudgetTracker.save_ledger, named
+after the account (e.g. ledgers/acct-00042.ledger). Accounts are split
+into shards of a few dozen and each shard is summarized by a worker
+process, which loads one account at a time, so memory stays flat however
+many accounts there are. Only a fixed number of shards is in flight, and
+results are written in account order as soon as they are ready.
+
+Output is either one combined JSON-lines or CSV file with a row per
+account and month, or one file per account with --per-account, which the
+workers write themselves.
+
+Usage:
+    python budget_accounts.py split transactions.csv ledgers/
+    python budget_accounts.py report ledgers/ -o summaries.jsonl [--workers 8]
+    python budget_accounts.py report ledgers/ --per-account summaries/ --format csv
+    python budget_accounts.py bench [--accounts 2000] [--transactions 300]
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from functools import partial
+from itertools import islice
+
+from arena.pools import ordered_map
+from budget_ingest import CSV_COLUMNS, validate_chunk
+from budget_tracker import BudgetTracker
+
+LEDGER_SUFFIX = ".ledger"
+CSV_FIELDS = ["account", "month", "total_income", "total_expenses", "net_savings", "savings_percentage"]
+
+
+def account_ledgers(directory):
+    """(account, path) of every ledger in a directory, sorted by account"""
+    return sorted(
+        (name[:-len(LEDGER_SUFFIX)], os.path.join(directory, name))
+        for name in os.listdir(directory) if name.endswith(LEDGER_SUFFIX)
+    )
+
+
+def account_summaries(account, path):
+    """Yield one summary row per month of an account's ledger"""
+    tracker = BudgetTracker()
+    tracker.load_ledger(path)
+    for month_key in sorted(tracker.data):
+        summary = tracker.get_monthly_summary(month_key)
+        yield {"account": account, **summary, "month": month_key, "month_name": summary["month"]}
+
+
+def write_rows(rows, stream, fmt, writer=None):
+    """Write summary rows as JSON lines or CSV, returning how many were written"""
+    count = 0
+    for row in rows:
+        if fmt == "csv":
+            writer.writerow([row[field] for field in CSV_FIELDS])
+        else:
+            stream.write(json.dumps(row) + "\n")
+        count += 1
+    return count
+
+
+def summarize_shard(accounts, fmt, per_account_dir=None):
+    """Summarize a shard of accounts; runs inside the worker processes.
+
+    Returns the rows for the combined output, or, with per_account_dir,
+    writes one file per account and returns the number of rows written.
+    """
+    if per_account_dir is None:
+        return [row for account, path in accounts for row in account_summaries(account, path)]
+
+    count = 0
+    for account, path in accounts:
+        filename = os.path.join(per_account_dir, f"{account}.{fmt}")
+        with open(filename, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f) if fmt == "csv" else None
+            if writer:
+                writer.writerow(CSV_FIELDS)
+            count += write_rows(account_summaries(account, path), f, fmt, writer)
+    return count
+
+
+def shard_results(accounts, workers, shard_size, fmt, per_account_dir=None):
+    """Yield each shard's result, in account order"""
+    accounts = iter(accounts)
+    shards = iter(lambda: list(islice(accounts, shard_size)), [])
+    return ordered_map(partial(summarize_shard, fmt=fmt, per_account_dir=per_account_dir), shards, workers)
+
+
+def report(ledger_dir, output, fmt, workers, shard_size=50, per_account_dir=None):
+    """Summarize every account and month, returning (accounts, rows)"""
+    accounts = account_ledgers(ledger_dir)
+    if per_account_dir is not None:
+        os.makedirs(per_account_dir, exist_ok=True)
+        rows = sum(shard_results(accounts, workers, shard_size, fmt, per_account_dir))
+        return len(accounts), rows
+
+    with open(output, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f) if fmt == "csv" else None
+        if writer:
+            writer.writerow(CSV_FIELDS)
+        rows = 0
+        for result in shard_results(accounts, workers, shard_size, fmt):
+            rows += write_rows(result, f, fmt, writer)
+    return len(accounts), rows
+
+
+def split(source, ledger_dir, chunk_size=10_000):
+    """Load a CSV of many accounts' transactions into one ledger per account.
+
+    The CSV needs an account column besides those budget_ingest reads.
+    Returns (accounts, transactions loaded, rejected rows).
+    """
+    columns = ("account", *CSV_COLUMNS)
+    trackers = {}
+    errors = []
+    pending = {}
+    pending_rows = 0
+
+    def flush():
+        for account, rows in pending.items():
+            tracker = trackers.get(account)
+            if tracker is None:
+                tracker = trackers[account] = BudgetTracker()
+            tracker.add_validated(validate_chunk(rows, errors))
+        pending.clear()
+
+    with open(source, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = [name.strip().lower() for name in next(reader, [])]
+        missing = [name for name in columns if name not in header]
+        if missing:
+            raise ValueError(f"CSV header is missing: {', '.join(missing)}")
+        positions = [header.index(name) for name in columns]
+        width = max(positions) + 1
+        for row in reader:
+            if len(row) < width:
+                errors.append((reader.line_num, "missing columns"))
+                continue
+            # Account names become file names, so they cannot leave ledger_dir
+            account = row[positions[0]].strip()
+            if not account or account.startswith(".") or "/" in account or os.sep in account:
+                errors.append((reader.line_num, f"invalid account {account!r}"))
+                continue
+            pending.setdefault(account, []).append((reader.line_num, *(row[i] for i in positions[1:])))
+            pending_rows += 1
+            if pending_rows >= chunk_size:
+                flush()
+                pending_rows = 0
+        flush()
+
+    os.makedirs(ledger_dir, exist_ok=True)
+    for account, tracker in trackers.items():
+        tracker.save_ledger(os.path.join(ledger_dir, account + LEDGER_SUFFIX))
+    errors.sort()
+    return len(trackers), sum(len(tracker) for tracker in trackers.values()), errors
+
+
+def generate_ledgers(ledger_dir, accounts, transactions):
+    """Write random ledgers for benchmarking"""
+    categories = ["food", "rent", "transport", "entertainment", "utilities"]
+    for i in range(accounts):
+        tracker = BudgetTracker()
+        for _ in range(transactions):
+            month = f"{random.randint(2021, 2024)}-{random.randint(1, 12):02d}"
+            if random.random() < 0.2:
+                tracker.add_transaction(month, "salary", random.randint(200_000, 500_000) / 100, "income")
+            else:
+                tracker.add_transaction(month, random.choice(categories), random.randint(100, 50_000) / 100, "expenses")
+        tracker.save_ledger(os.path.join(ledger_dir, f"acct-{i:06d}{LEDGER_SUFFIX}"))
+
+
+def bench(accounts, transactions, workers):
+    directory = tempfile.mkdtemp()
+    try:
+        ledger_dir = os.path.join(directory, "ledgers")
+        os.makedirs(ledger_dir)
+        generate_ledgers(ledger_dir, accounts, transactions)
+        output = os.path.join(directory, "summaries.jsonl")
+        baseline = None
+        for count in sorted({1, workers}):
+            start = time.perf_counter()
+            _, rows = report(ledger_dir, output, "jsonl", count)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{count} worker(s): {accounts / elapsed:,.0f} accounts/s, {rows:,} summaries"
+                  f" in {elapsed:.2f}s ({baseline / elapsed:.1f}x)")
+    finally:
+        shutil.rmtree(directory)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monthly summaries for many accounts")
+    commands = parser.add_subparsers(dest="command", required=True)
+    split_command = commands.add_parser("split", help="turn a multi-account CSV into per-account ledgers")
+    split_command.add_argument("source")
+    split_command.add_argument("ledgers")
+    report_command = commands.add_parser("report", help="summarize every account and month")
+    report_command.add_argument("ledgers")
+    report_command.add_argument("-o", "--output", default="summaries.jsonl", help="combined output file")
+    report_command.add_argument("--per-account", metavar="DIR", help="write one file per account here instead")
+    report_command.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    report_command.add_argument("--shard-size", type=int, default=50, help="accounts per task")
+    bench_command = commands.add_parser("bench", help="time the report on generated accounts")
+    bench_command.add_argument("--accounts", type=int, default=2000)
+    bench_command.add_argument("--transactions", type=int, default=300, help="transactions per account")
+    for command in (report_command, bench_command):
+        command.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    if getattr(args, "workers", 1) is None:
+        args.workers = os.cpu_count() or 1
+
+    if args.command == "split":
+        try:
+            accounts, loaded, errors = split(args.source, args.ledgers)
+        except ValueError as error:
+            print(f"Error: {error}", file=sys.stderr)
+            return 1
+        print(f"Wrote {accounts:,} ledgers with {loaded:,} transactions, rejected {len(errors):,} rows")
+        for line_number, reason in errors[:10]:
+            print(f"  line {line_number}: {reason}")
+    elif args.command == "report":
+        start = time.perf_counter()
+        accounts, rows = report(args.ledgers, args.output, args.format, args.workers,
+                                args.shard_size, args.per_account)
+        elapsed = time.perf_counter() - start
+        print(f"Summarized {accounts:,} accounts ({rows:,} months) in {elapsed:.2f}s")
+    else:
+        bench(args.accounts, args.transactions, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
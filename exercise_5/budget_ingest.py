@@ -0,0 +1,212 @@
+"""Bulk loading of bank exports into a BudgetTracker.
+
+Rows are streamed in chunks, validated a chunk at a time and appended to
+the tracker's ledger without going through add_transaction, which parses
+every date with strptime and prints on every bad row. Dates are parsed by
+position (YYYY-MM or YYYY-MM-DD) and cached, since an export repeats the
+same few hundred dates over and over. Bad rows are collected with their
+line number and reason instead of stopping the load.
+
+CSV files need a header with date, category, amount and type columns.
+OFX-like files are read from their <STMTTRN> blocks: DTPOSTED is the
+date, NAME the category, and the sign of TRNAMT the type.
+
+Usage:
+    python budget_ingest.py load export.csv [--errors errors.csv] [--ledger ledger.bin]
+    python budget_ingest.py load statement.ofx --format ofx
+    python budget_ingest.py bench [--rows 200000]
+"""
+import argparse
+import csv
+import io
+import random
+import sys
+import time
+from datetime import date
+from functools import lru_cache
+from itertools import islice
+
+from budget_tracker import BudgetTracker
+
+CSV_COLUMNS = ("date", "category", "amount", "type")
+TRANSACTION_TYPES = {"income": "income", "expenses": "expenses"}
+
+
+@lru_cache(maxsize=1 << 16)
+def parse_date(text):
+    """(date ordinal, month key) for YYYY-MM or YYYY-MM-DD, or None if invalid"""
+    if len(text) == 7:
+        day = "01"
+    elif len(text) == 10 and text[7] == "-":
+        day = text[8:]
+    else:
+        return None
+    year, month = text[:4], text[5:7]
+    digits = year + month + day
+    if text[4] != "-" or not (digits.isascii() and digits.isdigit()):
+        return None
+    try:
+        return date(int(year), int(month), int(day)).toordinal(), text[:7]
+    except ValueError:
+        return None
+
+
+def transaction_type(text):
+    """Normalized type for a type column, or None; same rule as add_transaction"""
+    trans_type = TRANSACTION_TYPES.get(text)
+    if trans_type is None:
+        trans_type = TRANSACTION_TYPES.get(text.strip().lower())
+    return trans_type
+
+
+def read_csv_rows(stream):
+    """Yield (line number, date, category, amount, type) from a CSV export"""
+    reader = csv.reader(stream)
+    header = [name.strip().lower() for name in next(reader, [])]
+    missing = [name for name in CSV_COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"CSV header is missing: {', '.join(missing)}")
+    positions = [header.index(name) for name in CSV_COLUMNS]
+    width = max(positions) + 1
+    for row in reader:
+        if len(row) < width:
+            yield reader.line_num, None, None, None, None
+        else:
+            yield (reader.line_num, *(row[i] for i in positions))
+
+
+def read_ofx_rows(stream):
+    """Yield (line number, date, category, amount, type) from <STMTTRN> blocks"""
+    fields = None
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if line.upper().startswith("<STMTTRN>"):
+            fields = {"line": line_number}
+        elif line.upper().startswith("</STMTTRN>") and fields is not None:
+            posted = fields.get("DTPOSTED", "")
+            amount = fields.get("TRNAMT", "")
+            sign_type = "expenses" if amount.startswith("-") else "income"
+            day = f"{posted[:4]}-{posted[4:6]}-{posted[6:8]}" if len(posted) >= 8 else posted
+            yield fields["line"], day, fields.get("NAME"), amount.lstrip("+-"), sign_type
+            fields = None
+        elif fields is not None and line.startswith("<") and ">" in line:
+            tag, _, value = line[1:].partition(">")
+            fields[tag.upper()] = value.split("<", 1)[0].strip()
+
+
+def validate_chunk(rows, errors):
+    """Turn raw rows into ledger records, appending (line, reason) to errors"""
+    records = []
+    for line_number, date_text, category, amount_text, type_text in rows:
+        if date_text is None:
+            errors.append((line_number, "missing columns"))
+            continue
+        parsed = parse_date(date_text.strip())
+        if parsed is None:
+            errors.append((line_number, f"invalid date {date_text!r}"))
+            continue
+        trans_type = transaction_type(type_text)
+        if trans_type is None:
+            errors.append((line_number, f"invalid type {type_text!r}"))
+            continue
+        try:
+            amount = float(amount_text)
+        except (TypeError, ValueError):
+            amount = 0
+        if not amount > 0 or amount == float("inf"):
+            errors.append((line_number, f"invalid amount {amount_text!r}"))
+            continue
+        category = (category or "").strip()
+        if not category:
+            errors.append((line_number, "missing category"))
+            continue
+        records.append((parsed[0], parsed[1], category, amount, trans_type))
+    return records
+
+
+def ingest(tracker, rows, chunk_size=10_000):
+    """Load rows into tracker chunk by chunk, returning (loaded, errors)"""
+    errors = []
+    loaded = 0
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        records = validate_chunk(chunk, errors)
+        tracker.add_validated(records)
+        loaded += len(records)
+    return loaded, errors
+
+
+def write_error_report(errors, filename):
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["line", "reason"])
+        writer.writerows(errors)
+
+
+def bench(count):
+    categories = ["food", "rent", "transport", "entertainment", "salary", "utilities"]
+    rows = [(f"{random.randint(2015, 2024)}-{random.randint(1, 12):02d}", random.choice(categories),
+             random.randint(100, 500_000) / 100, random.choice(["income", "expenses"]))
+            for _ in range(count)]
+    text = "date,category,amount,type\n" + "".join(f"{d},{c},{a},{t}\n" for d, c, a, t in rows)
+
+    start = time.perf_counter()
+    per_call = BudgetTracker()
+    for row in rows:
+        per_call.add_transaction(*row)
+    per_call_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bulk = BudgetTracker()
+    loaded, errors = ingest(bulk, read_csv_rows(io.StringIO(text)))
+    bulk_time = time.perf_counter() - start
+
+    assert loaded == count and not errors and bulk.amount_cents == per_call.amount_cents
+    print(f"add_transaction: {count / per_call_time:,.0f} rows/s (already parsed values)")
+    print(f"ingest:          {count / bulk_time:,.0f} rows/s (including CSV parsing)")
+    print(f"Speedup: {per_call_time / bulk_time:.1f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load transactions into a budget ledger")
+    commands = parser.add_subparsers(dest="command", required=True)
+    load = commands.add_parser("load", help="load a CSV or OFX-like export")
+    load.add_argument("input")
+    load.add_argument("--format", choices=["csv", "ofx"], default="csv")
+    load.add_argument("--errors", help="write rejected rows to this CSV file")
+    load.add_argument("--ledger", help="save the loaded ledger to this file")
+    load.add_argument("--chunk-size", type=int, default=10_000)
+    bench_command = commands.add_parser("bench", help="compare ingest with add_transaction")
+    bench_command.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        bench(args.rows)
+        return 0
+
+    tracker = BudgetTracker()
+    start = time.perf_counter()
+    with open(args.input, encoding="utf-8", newline="") as f:
+        try:
+            rows = read_csv_rows(f) if args.format == "csv" else read_ofx_rows(f)
+            loaded, errors = ingest(tracker, rows, args.chunk_size)
+        except ValueError as error:
+            print(f"Error: {error}", file=sys.stderr)
+            return 1
+    elapsed = time.perf_counter() - start
+
+    print(f"Loaded {loaded:,} transactions in {elapsed:.2f}s ({loaded / elapsed if elapsed else 0:,.0f} rows/s)")
+    print(f"Rejected {len(errors):,} rows")
+    if errors and args.errors:
+        write_error_report(errors, args.errors)
+        print(f"Error report written to {args.errors}")
+    elif errors:
+        for line_number, reason in errors[:10]:
+            print(f"  line {line_number}: {reason}")
+    if args.ledger:
+        tracker.save_ledger(args.ledger)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
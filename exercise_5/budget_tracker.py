@@ -1,22 +1,124 @@
+import bisect
 import calendar
-from datetime import datetime
+import csv
+import io
+import json
+import struct
+from array import array
+from datetime import date, datetime
 from collections import defaultdict
 
+from arena.durable_log import write_atomically
+from arena.money import format_cents, sum_cents, to_cents
+
+TRANSACTION_TYPES = ("income", "expenses")
+# Percentages of a budget limit that raise an alert when spending crosses them
+ALERT_THRESHOLDS = (80, 100, 120)
+# magic, transactions, categories, category name bytes
+LEDGER_HEADER = struct.Struct("<8sQQQ")
+LEDGER_MAGIC = b"BUDGETL2"
+SUMMARY_FORMATS = ("text", "json", "csv")
+CSV_HEADER = "month,section,category,amount,percentage\n"
+EXPORT_BUFFER_SIZE = 1 << 16
+
+def _summary_lines(summary):
+    """Heading and financial summary lines shared by the display and text export"""
+    return [
+        "=== PERSONAL BUDGET TRACKER ===",
+        f"Month: {summary['month']}",
+        "",
+        "💰 FINANCIAL SUMMARY",
+        f"Total Income: ${summary['total_income']:,.2f}",
+        f"Total Expenses: ${summary['total_expenses']:,.2f}",
+        f"Net Savings: ${summary['net_savings']:,.2f} ({summary['savings_percentage']:.1f}%)",
+        "",
+    ]
+
+def _breakdown_lines(title, breakdown, total, bars=False):
+    """A breakdown's title and one line per category, with or without bar charts"""
+    lines = [title]
+    for category, amount in breakdown.items():
+        percentage = amount / total * 100 if total > 0 else 0
+        bar = '█' * int(percentage / 5) + " " if bars else ""  # Each █ represents 5%
+        lines.append(f"{category.title():<15} {bar}{percentage:.1f}% (${amount:,.2f})")
+    return lines
+
+def render_summary(month_key, summary, fmt="text"):
+    """Render a get_monthly_summary result as text, a JSON line or CSV rows"""
+    if fmt == "json":
+        return json.dumps({"month_key": month_key, **summary}) + "\n"
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        for section, breakdown, total in (
+            ("income", summary["income_breakdown"], summary["total_income"]),
+            ("expenses", summary["expense_breakdown"], summary["total_expenses"]),
+        ):
+            for category, amount in breakdown.items():
+                percentage = amount / total * 100 if total > 0 else 0
+                writer.writerow([month_key, section, category, f"{amount:.2f}", f"{percentage:.1f}"])
+            writer.writerow([month_key, section, "", f"{total:.2f}", "100.0" if total > 0 else "0.0"])
+        writer.writerow([month_key, "net_savings", "", f"{summary['net_savings']:.2f}",
+                         f"{summary['savings_percentage']:.1f}"])
+        return buffer.getvalue()
+    if fmt != "text":
+        raise ValueError(f"Unknown format {fmt!r}; use one of {', '.join(SUMMARY_FORMATS)}")
+    lines = _summary_lines(summary)
+    lines += _breakdown_lines("📈 INCOME BREAKDOWN", summary['income_breakdown'], summary['total_income'])
+    lines.append("")
+    lines += _breakdown_lines("📉 EXPENSE BREAKDOWN", summary['expense_breakdown'], summary['total_expenses'])
+    return "\n".join(lines) + "\n"
+
 class BudgetTracker:
     def __init__(self):
+        # Month -> type -> category totals, kept up to date from the ledger.
+        # The totals are added up in integer cents in _cents (see
+        # arena.money) and data holds them in dollars.
         self.data = {}
+        self._cents = {}
         self.budget_limits = {}
+        # Month -> categories over their limit, in the order they went over
+        self._over_limit = {}
+        self._alert_handlers = []
+        # Transaction ledger, one typed column per field (17 bytes a row)
+        self.dates = array('i')
+        self.category_ids = array('I')
+        self.types = array('B')
+        self.amount_cents = array('q')
+        self.categories = []
+        self._category_index = {}
+        self._reset_month_index()
+        # Month -> summary, and month -> {format: rendered summary}; a month's
+        # entries are dropped whenever one of its transactions is recorded
+        self._summaries = {}
+        self._rendered = {}
+    
+    def _reset_month_index(self):
+        # Sorted month keys, and per expense category (None for all of them)
+        # prefix sums over those months: cents, and cents weighted by position
+        self._months = []
+        self._prefix = {}
+        self._expense_categories = {}
+        # Prefix sums are rebuilt lazily from the earliest month changed since
+        self._dirty_month = None
     
     def _initialize_month(self, month_key):
         """Initialize data structure for a new month if it doesn't exist"""
         if month_key not in self.data:
             self.data[month_key] = {"income": {}, "expenses": {}}
+            self._cents[month_key] = {"income": {}, "expenses": {}}
+            bisect.insort(self._months, month_key)
+            self._mark_dirty(month_key)
+    
+    def _mark_dirty(self, month_key):
+        if self._dirty_month is None or month_key < self._dirty_month:
+            self._dirty_month = month_key
     
     def add_transaction(self, date_str, category, amount, transaction_type):
         """Add an income or expense transaction"""
         try:
-            date = datetime.strptime(date_str, "%Y-%m")
-            month_key = date.strftime("%Y-%m")
+            parsed = datetime.strptime(date_str, "%Y-%m")
+            month_key = parsed.strftime("%Y-%m")
         except ValueError:
             print("Invalid date format. Please use YYYY-MM.")
             return False
@@ -29,39 +131,197 @@ class BudgetTracker:
             print("Amount must be a positive number.")
             return False
         
-        # Initialize month if it doesn't exist
-        self._initialize_month(month_key)
-        
         # Normalize transaction type
         trans_type = "expenses" if transaction_type.lower().startswith("expens") else "income"
         
-        # Add the transaction
-        if category in self.data[month_key][trans_type]:
-            self.data[month_key][trans_type][category] += amount
-        else:
-            self.data[month_key][trans_type][category] = amount
-        
+        # Transactions without a day are dated the first of the month
+        self._record(parsed.toordinal(), month_key, category, amount, trans_type)
         return True
     
+    def _category_id(self, category):
+        category_id = self._category_index.get(category)
+        if category_id is None:
+            category_id = self._category_index[category] = len(self.categories)
+            self.categories.append(category)
+        return category_id
+    
+    def _record(self, ordinal, month_key, category, amount, trans_type):
+        """Append a validated transaction to the ledger and update the monthly view"""
+        self.dates.append(ordinal)
+        self.category_ids.append(self._category_id(category))
+        self.types.append(TRANSACTION_TYPES.index(trans_type))
+        cents = to_cents(amount)
+        self.amount_cents.append(cents)
+        
+        self._initialize_month(month_key)
+        self._summaries.pop(month_key, None)
+        self._rendered.pop(month_key, None)
+        totals = self._cents[month_key][trans_type]
+        total = totals[category] = totals.get(category, 0) + cents
+        self.data[month_key][trans_type][category] = total / 100
+        if trans_type == "expenses":
+            self._expense_categories[category] = None
+            self._mark_dirty(month_key)
+            if category in self.budget_limits:
+                self._check_limit(month_key, category, total - cents, total)
+    
+    def add_alert_handler(self, handler):
+        """Call handler(alert) whenever spending crosses an alert threshold.
+        
+        An alert is a dict with the month, category, threshold crossed,
+        amount spent, limit and percentage of the limit spent. Pass a
+        queue's put method to receive alerts on a queue instead.
+        """
+        self._alert_handlers.append(handler)
+    
+    def _check_limit(self, month_key, category, before, after):
+        """Update the over-limit index and raise alerts for one category's new total in cents"""
+        limit = self.budget_limits[category]
+        limit_cents = to_cents(limit)
+        if after > limit_cents:
+            self._over_limit.setdefault(month_key, {})[category] = None
+        if not self._alert_handlers:
+            return
+        for threshold in ALERT_THRESHOLDS:
+            # Compared multiplied by 100 so the levels stay exact too
+            if 100 * before < limit_cents * threshold <= 100 * after:
+                alert = {
+                    "month": month_key,
+                    "category": category,
+                    "threshold": threshold,
+                    "spent": after / 100,
+                    "limit": limit,
+                    "percent": after / limit_cents * 100,
+                }
+                for handler in self._alert_handlers:
+                    handler(alert)
+    
+    def _rebuild_over_limit(self, categories):
+        """Recompute the over-limit index of some categories across every month"""
+        limits = {category: to_cents(self.budget_limits[category])
+                  for category in categories if category in self.budget_limits}
+        for month_key, month_cents in self._cents.items():
+            over = self._over_limit.get(month_key, {})
+            for category in categories:
+                limit = limits.get(category)
+                if limit is not None and month_cents["expenses"].get(category, 0) > limit:
+                    over[category] = None
+                else:
+                    over.pop(category, None)
+            if over:
+                self._over_limit[month_key] = over
+            else:
+                self._over_limit.pop(month_key, None)
+    
+    def add_validated(self, records):
+        """Bulk-append already validated (ordinal, month key, category, amount, type) records"""
+        record = self._record
+        for ordinal, month_key, category, amount, trans_type in records:
+            record(ordinal, month_key, category, amount, trans_type)
+    
+    def __len__(self):
+        return len(self.dates)
+    
+    def transactions(self, month_key=None):
+        """Yield the ledger as dicts in the order recorded, optionally for one month"""
+        if month_key is not None:
+            year, month = map(int, month_key.split('-'))
+            first = date(year, month, 1).toordinal()
+            last = first + calendar.monthrange(year, month)[1]
+        for i, ordinal in enumerate(self.dates):
+            if month_key is not None and not first <= ordinal < last:
+                continue
+            yield {
+                "date": date.fromordinal(ordinal).isoformat(),
+                "category": self.categories[self.category_ids[i]],
+                "type": TRANSACTION_TYPES[self.types[i]],
+                "amount": self.amount_cents[i] / 100,
+            }
+    
+    def rebuild_view(self):
+        """Recompute the monthly totals in self.data from the ledger"""
+        cents = defaultdict(int)
+        for ordinal, category_id, type_id, amount in zip(self.dates, self.category_ids,
+                                                         self.types, self.amount_cents):
+            cents[ordinal, category_id, type_id] += amount
+        
+        self.data = {}
+        self._cents = {}
+        self._summaries = {}
+        self._rendered = {}
+        self._reset_month_index()
+        month_keys = {}
+        for (ordinal, category_id, type_id), amount in cents.items():
+            month_key = month_keys.get(ordinal)
+            if month_key is None:
+                month_key = month_keys[ordinal] = date.fromordinal(ordinal).strftime("%Y-%m")
+            self._initialize_month(month_key)
+            totals = self._cents[month_key][TRANSACTION_TYPES[type_id]]
+            category = self.categories[category_id]
+            totals[category] = totals.get(category, 0) + amount
+            if type_id == TRANSACTION_TYPES.index("expenses"):
+                self._expense_categories[category] = None
+        for month_key, month_cents in self._cents.items():
+            for trans_type, totals in month_cents.items():
+                self.data[month_key][trans_type] = {category: cents / 100 for category, cents in totals.items()}
+        self._over_limit = {}
+        self._rebuild_over_limit(self.budget_limits)
+    
+    def save_ledger(self, filename):
+        """Write the ledger to a binary file, replacing it atomically"""
+        names = "\0".join(self.categories).encode("utf-8")
+
+        def write(f):
+            f.write(LEDGER_HEADER.pack(LEDGER_MAGIC, len(self.dates), len(self.categories), len(names)))
+            f.write(names)
+            for column in (self.dates, self.category_ids, self.types, self.amount_cents):
+                column.tofile(f)
+
+        write_atomically(filename, write)
+    
+    def load_ledger(self, filename):
+        """Replace the ledger with one written by save_ledger and rebuild the view"""
+        with open(filename, "rb") as f:
+            magic, count, category_count, names_length = LEDGER_HEADER.unpack(f.read(LEDGER_HEADER.size))
+            if magic != LEDGER_MAGIC:
+                raise ValueError(f"{filename} is not a budget ledger")
+            names = f.read(names_length).decode("utf-8")
+            # The count, not the length, says whether there are any: a
+            # single category named "" has no name bytes either
+            self.categories = names.split("\0") if category_count else []
+            self._category_index = {name: i for i, name in enumerate(self.categories)}
+            self.dates, self.category_ids = array('i'), array('I')
+            self.types, self.amount_cents = array('B'), array('q')
+            for column in (self.dates, self.category_ids, self.types, self.amount_cents):
+                column.fromfile(f, count)
+        self.rebuild_view()
+    
     def set_budget_limit(self, category, limit):
-        """Set monthly budget limit for a category"""
+        """Set monthly budget limit for a category; alerts start with the next transaction"""
         if not isinstance(limit, (int, float)) or limit <= 0:
             print("Limit must be a positive number.")
             return False
         
         self.budget_limits[category] = limit
+        self._rebuild_over_limit([category])
         return True
     
     def get_monthly_summary(self, month_key):
-        """Generate summary for a specific month"""
+        """Generate summary for a specific month, cached until the month changes"""
+        summary = self._summaries.get(month_key)
+        if summary is not None:
+            return summary
         if month_key not in self.data:
             print(f"No data available for {month_key}")
             return None
         
         month_data = self.data[month_key]
-        total_income = sum(month_data["income"].values())
-        total_expenses = sum(month_data["expenses"].values())
-        net_savings = total_income - total_expenses
+        month_cents = self._cents[month_key]
+        income_cents = sum_cents(month_cents["income"].values())
+        expense_cents = sum_cents(month_cents["expenses"].values())
+        total_income = income_cents / 100
+        total_expenses = expense_cents / 100
+        net_savings = (income_cents - expense_cents) / 100
         savings_percentage = (net_savings / total_income * 100) if total_income > 0 else 0
         
         # Format month name for display
@@ -78,20 +338,28 @@ class BudgetTracker:
             "expense_breakdown": month_data["expenses"]
         }
         
+        self._summaries[month_key] = summary
         return summary
     
+    def render_summary(self, month_key, fmt="text"):
+        """A month's summary rendered as text, JSON or CSV, or None without data"""
+        rendered = self._rendered.get(month_key, {})
+        if fmt in rendered:
+            return rendered[fmt]
+        summary = self.get_monthly_summary(month_key)
+        if not summary:
+            return None
+        text = render_summary(month_key, summary, fmt)
+        self._rendered.setdefault(month_key, {})[fmt] = text
+        return text
+    
     def display_summary(self, month_key):
         """Display formatted monthly summary"""
         summary = self.get_monthly_summary(month_key)
         if not summary:
             return
         
-        print(f"=== PERSONAL BUDGET TRACKER ===")
-        print(f"Month: {summary['month']}\n")
-        print("💰 FINANCIAL SUMMARY")
-        print(f"Total Income: ${summary['total_income']:,.2f}")
-        print(f"Total Expenses: ${summary['total_expenses']:,.2f}")
-        print(f"Net Savings: ${summary['net_savings']:,.2f} ({summary['savings_percentage']:.1f}%)\n")
+        print("\n".join(_summary_lines(summary)))
         
         # Display budget warnings
         self._display_budget_warnings(month_key)
@@ -108,14 +376,22 @@ class BudgetTracker:
         print("⚠️ BUDGET WARNINGS")
         warnings = []
         
-        for category, spent in self.data[month_key]["expenses"].items():
-            if category in self.budget_limits:
-                limit = self.budget_limits[category]
-                if spent > limit:
-                    over_percent = (spent - limit) / limit * 100
-                    warnings.append(
-                        f"- {category}: ${spent:,.2f} spent (${limit:,.2f} limit, {over_percent:.1f}% over)"
-                    )
+        # Only the categories already known to be over their limit, listed in
+        # the order the month's expenses were first recorded, as before
+        expenses = self.data[month_key]["expenses"]
+        over = self._over_limit.get(month_key, ())
+        if over:
+            positions = {category: i for i, category in enumerate(expenses)}
+            over = sorted(over, key=positions.__getitem__)
+        spent_cents = self._cents[month_key]["expenses"]
+        for category in over:
+            spent = expenses[category]
+            limit = self.budget_limits[category]
+            over_percent = (spent - limit) / limit * 100
+            warnings.append(
+                f"- {category}: {format_cents(spent_cents[category])} spent"
+                f" ({format_cents(to_cents(limit))} limit, {over_percent:.1f}% over)"
+            )
         
         if warnings:
             print("\n".join(warnings))
@@ -128,13 +404,7 @@ class BudgetTracker:
         if not income_data:
             return
         
-        print("📈 INCOME BREAKDOWN")
-        total = sum(income_data.values())
-        
-        for category, amount in income_data.items():
-            percentage = amount / total * 100
-            bar = '█' * int(percentage / 5)  # Each █ represents 5%
-            print(f"{category.title():<15} {bar} {percentage:.1f}% (${amount:,.2f})")
+        print("\n".join(_breakdown_lines("📈 INCOME BREAKDOWN", income_data, sum(income_data.values()), bars=True)))
         print()
     
     def _display_expense_chart(self, expense_data):
@@ -142,29 +412,112 @@ class BudgetTracker:
         if not expense_data:
             return
         
-        print("📉 EXPENSE BREAKDOWN")
-        total = sum(expense_data.values())
-        
-        for category, amount in expense_data.items():
-            percentage = amount / total * 100
-            bar = '█' * int(percentage / 5)  # Each █ represents 5%
-            print(f"{category.title():<15} {bar} {percentage:.1f}% (${amount:,.2f})")
+        print("\n".join(_breakdown_lines("📉 EXPENSE BREAKDOWN", expense_data, sum(expense_data.values()), bars=True)))
         print()
     
+    def _refresh_prefix_sums(self):
+        """Bring the prefix sums up to date from the earliest changed month on"""
+        months = self._months
+        if self._dirty_month is None:
+            start = len(months)
+        else:
+            start = bisect.bisect_left(months, self._dirty_month)
+        for key in [None, *self._expense_categories]:
+            sums = self._prefix.get(key)
+            if sums is None:
+                sums = self._prefix[key] = (array('q', [0]), array('q', [0]))
+                first = 0
+            else:
+                first = min(start, len(sums[0]) - 1)
+            totals, weighted = sums
+            del totals[first + 1:]
+            del weighted[first + 1:]
+            for i in range(first, len(months)):
+                expenses = self._cents[months[i]]["expenses"]
+                cents = sum_cents(expenses.values()) if key is None else expenses.get(key, 0)
+                totals.append(totals[-1] + cents)
+                weighted.append(weighted[-1] + i * cents)
+        self._dirty_month = None
+    
+    def _month_span(self, start_month=None, end_month=None):
+        """Positions [first, last) of the months from start_month to end_month inclusive"""
+        first = 0 if start_month is None else bisect.bisect_left(self._months, start_month)
+        last = len(self._months) if end_month is None else bisect.bisect_right(self._months, end_month)
+        return first, max(first, last)
+    
+    def _sums(self, category):
+        if self._dirty_month is not None or category not in self._prefix:
+            self._refresh_prefix_sums()
+        return self._prefix.get(category)
+    
+    def range_total(self, category=None, start_month=None, end_month=None):
+        """Expenses of a category (None for all) from start_month to end_month inclusive"""
+        first, last = self._month_span(start_month, end_month)
+        sums = self._sums(category)
+        if sums is None:
+            return 0.0
+        return (sums[0][last] - sums[0][first]) / 100
+    
+    def spending_trends(self, categories=None, num_months=None, window=3):
+        """Trend figures for several expense categories at once.
+        
+        Returns {category: {...}} with the months covered, monthly totals,
+        rolling averages over window months, month-over-month deltas, the
+        total and the least-squares slope in dollars per month. Months are
+        the ones with any data, so gaps in the history are skipped over.
+        None in categories stands for all expenses together.
+        """
+        if categories is None:
+            self._sums(None)
+            categories = [None, *self._expense_categories]
+        first, last = self._month_span()
+        if num_months is not None:
+            first = max(first, last - num_months)
+        months = self._months[first:last]
+        
+        trends = {}
+        for category in categories:
+            sums = self._sums(category)
+            totals = sums[0] if sums else array('q', bytes(8 * (last + 1)))
+            monthly = [totals[i + 1] - totals[i] for i in range(first, last)]
+            rolling = [
+                (totals[i + 1] - totals[max(first, i + 1 - window)]) / min(window, i + 1 - first) / 100
+                for i in range(first, last)
+            ]
+            trends[category] = {
+                "months": months,
+                "totals": [cents / 100 for cents in monthly],
+                "rolling_average": rolling,
+                "month_over_month": [(b - a) / 100 for a, b in zip(monthly, monthly[1:])],
+                "total": (totals[last] - totals[first]) / 100,
+                "slope": self._slope(sums, first, last) if sums else 0.0,
+            }
+        return trends
+    
+    def _slope(self, sums, first, last):
+        """Least-squares slope of monthly totals over positions [first, last), in O(1)"""
+        n = last - first
+        if n < 2:
+            return 0.0
+        totals, weighted = sums
+        sum_y = totals[last] - totals[first]
+        # x counts months from the start of the span
+        sum_xy = weighted[last] - weighted[first] - first * sum_y
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        return (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x ** 2) / 100
+    
     def analyze_spending_trends(self, category, num_months=3):
         """Analyze spending trends for a category"""
-        sorted_months = sorted(self.data.keys(), reverse=True)
-        relevant_months = sorted_months[:num_months]
+        trend_data = self.spending_trends([category], num_months)[category]
+        # Most recent month first
+        relevant_months = trend_data["months"][::-1]
+        amounts = trend_data["totals"][::-1]
         
         if not relevant_months:
             print("No data available for trend analysis.")
             return
         
-        amounts = []
-        for month in relevant_months:
-            amount = self.data[month]["expenses"].get(category, 0)
-            amounts.append(amount)
-        
         if len(amounts) < 2:
             print("Not enough data to analyze trends.")
             return
@@ -186,32 +539,37 @@ class BudgetTracker:
         else:
             print("\nTrend: No significant change")
     
-    def export_monthly_summary(self, month_key, filename="budget_summary.txt"):
-        """Export monthly summary to a text file"""
-        summary = self.get_monthly_summary(month_key)
-        if not summary:
+    def export_monthly_summary(self, month_key, filename="budget_summary.txt", fmt="text"):
+        """Export monthly summary to a text, JSON or CSV file"""
+        text = self.render_summary(month_key, fmt)
+        if text is None:
             return False
         
-        with open(filename, 'w') as f:
-            f.write(f"=== PERSONAL BUDGET TRACKER ===\n")
-            f.write(f"Month: {summary['month']}\n\n")
-            f.write("💰 FINANCIAL SUMMARY\n")
-            f.write(f"Total Income: ${summary['total_income']:,.2f}\n")
-            f.write(f"Total Expenses: ${summary['total_expenses']:,.2f}\n")
-            f.write(f"Net Savings: ${summary['net_savings']:,.2f} ({summary['savings_percentage']:.1f}%)\n\n")
-            
-            f.write("📈 INCOME BREAKDOWN\n")
-            for category, amount in summary['income_breakdown'].items():
-                percentage = amount / summary['total_income'] * 100 if summary['total_income'] > 0 else 0
-                f.write(f"{category.title():<15} {percentage:.1f}% (${amount:,.2f})\n")
-            
-            f.write("\n📉 EXPENSE BREAKDOWN\n")
-            for category, amount in summary['expense_breakdown'].items():
-                percentage = amount / summary['total_expenses'] * 100 if summary['total_expenses'] > 0 else 0
-                f.write(f"{category.title():<15} {percentage:.1f}% (${amount:,.2f})\n")
+        with open(filename, 'w', encoding="utf-8", buffering=EXPORT_BUFFER_SIZE) as f:
+            if fmt == "csv":
+                f.write(CSV_HEADER)
+            f.write(text)
         
         print(f"Summary exported to {filename}")
         return True
+    
+    def export_summaries(self, filename, fmt="json", month_keys=None):
+        """Export several months (all by default) to one file, returning how many were written"""
+        if month_keys is None:
+            month_keys = self._months
+        count = 0
+        with open(filename, 'w', encoding="utf-8", buffering=EXPORT_BUFFER_SIZE) as f:
+            if fmt == "csv":
+                f.write(CSV_HEADER)
+            for month_key in month_keys:
+                text = self.render_summary(month_key, fmt)
+                if text is not None:
+                    # Text summaries are separated by a blank line
+                    if fmt == "text" and count:
+                        f.write("\n")
+                    f.write(text)
+                    count += 1
+        return count
 
 
 # Example usage
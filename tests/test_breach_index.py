@@ -0,0 +1,28 @@
+from breach_index import BreachIndex, build_index
+
+
+def build(tmp_path, passwords, **options):
+    source = tmp_path / "breached.txt"
+    source.write_text("".join(password + "\n" for password in passwords), encoding="utf-8")
+    index_path = str(tmp_path / "breached.idx")
+    count = build_index(str(source), index_path, **options)
+    return count, BreachIndex(index_path)
+
+
+def test_lookup_is_case_insensitive(tmp_path):
+    count, index = build(tmp_path, ["Password", "letmein", "password"])
+    with index:
+        assert count == len(index) == 2
+        assert "PASSWORD" in index
+        assert "letmein" in index
+        assert "hunter2" not in index
+
+
+def test_keys_with_control_characters_merge_in_order(tmp_path):
+    passwords = ["abc", "abc\tx", "abd", "abc", "ab\x01", "abd"]
+    count, index = build(tmp_path, passwords, run_size=2)
+    with index:
+        assert count == 4
+        for password in passwords:
+            assert password in index
+        assert "ab" not in index
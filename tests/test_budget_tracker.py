@@ -0,0 +1,157 @@
+import random
+
+import pytest
+
+from budget_tracker import BudgetTracker
+
+
+def test_ledger_round_trip(tmp_path):
+    tracker = BudgetTracker()
+    tracker.add_transaction("2024-01", "salary", 3000, "income")
+    tracker.add_transaction("2024-01", "food", 120.5, "expenses")
+    tracker.add_transaction("2024-02", "food", 99.99, "expenses")
+    path = str(tmp_path / "ledger.bin")
+    tracker.save_ledger(path)
+
+    loaded = BudgetTracker()
+    loaded.load_ledger(path)
+    assert len(loaded) == 3
+    assert loaded.data == tracker.data
+    assert list(loaded.transactions("2024-02")) == list(tracker.transactions("2024-02"))
+
+
+def test_ledger_with_only_an_empty_category_name(tmp_path):
+    tracker = BudgetTracker()
+    tracker.add_transaction("2024-01", "", 10, "expenses")
+    path = str(tmp_path / "ledger.bin")
+    tracker.save_ledger(path)
+
+    loaded = BudgetTracker()
+    loaded.load_ledger(path)
+    assert loaded.categories == [""]
+    assert loaded.data == {"2024-01": {"income": {}, "expenses": {"": 10.0}}}
+
+
+def test_budget_warnings_follow_expense_order(capsys):
+    tracker = BudgetTracker()
+    tracker.set_budget_limit("food", 100)
+    tracker.set_budget_limit("fun", 50)
+    tracker.add_transaction("2024-01", "food", 60, "expenses")
+    tracker.add_transaction("2024-01", "fun", 80, "expenses")
+    tracker.add_transaction("2024-01", "food", 60, "expenses")
+    capsys.readouterr()
+
+    tracker._display_budget_warnings("2024-01")
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1].startswith("- food: $120.00 spent")
+    assert lines[2].startswith("- fun: $80.00 spent")
+
+
+def _random_tracker(seed=7):
+    """A tracker with expenses in random months (with gaps) and their cents"""
+    rng = random.Random(seed)
+    tracker = BudgetTracker()
+    cents = {}
+    for _ in range(300):
+        month = f"2023-{rng.choice([1, 2, 3, 5, 6, 9, 12]):02d}"
+        category = rng.choice(["food", "rent", "fun"])
+        amount = rng.randrange(1, 50_000)
+        tracker.add_transaction(month, category, amount / 100, "expenses")
+        cents[month, category] = cents.get((month, category), 0) + amount
+    return tracker, cents
+
+
+def _brute_total(cents, category, months):
+    return sum(amount for (month, name), amount in cents.items()
+               if month in months and category in (None, name))
+
+
+def _brute_slope(totals):
+    n = len(totals)
+    if n < 2:
+        return 0.0
+    mean_x, mean_y = (n - 1) / 2, sum(totals) / n
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(totals))
+    return covariance / sum((x - mean_x) ** 2 for x in range(n))
+
+
+def test_range_totals_match_brute_force():
+    tracker, cents = _random_tracker()
+    months = sorted(tracker.data)
+    for category in (None, "food", "rent", "fun"):
+        for first in range(len(months)):
+            for last in range(first, len(months)):
+                expected = _brute_total(cents, category, months[first:last + 1])
+                assert tracker.range_total(category, months[first], months[last]) == expected / 100
+    # Empty ranges: months without data, and an end before the start
+    assert tracker.range_total("food", "2023-07", "2023-08") == 0
+    assert tracker.range_total(None, "2023-12", "2023-01") == 0
+    assert tracker.range_total("travel") == 0
+
+    # A change to an earlier month refreshes the sums from that month on
+    tracker.add_transaction("2023-02", "food", 12.34, "expenses")
+    tracker.add_transaction("2023-04", "rent", 5, "expenses")
+    cents["2023-02", "food"] += 1234
+    cents["2023-04", "rent"] = 500
+    assert tracker.range_total("food") == _brute_total(cents, "food", set(tracker.data)) / 100
+    assert tracker.range_total(None, "2023-03", "2023-05") == \
+        _brute_total(cents, None, {"2023-03", "2023-04", "2023-05"}) / 100
+
+
+def test_spending_trends_match_brute_force():
+    tracker, cents = _random_tracker()
+    months = sorted(tracker.data)
+    for num_months in (1, 2, 4, None):
+        covered = months if num_months is None else months[-num_months:]
+        trends = tracker.spending_trends(num_months=num_months)
+        for category in (None, "food", "rent", "fun"):
+            trend = trends[category]
+            totals = [_brute_total(cents, category, [month]) / 100 for month in covered]
+            assert trend["months"] == covered
+            assert trend["totals"] == totals
+            assert trend["total"] == _brute_total(cents, category, covered) / 100
+            assert trend["slope"] == pytest.approx(_brute_slope(totals))
+    # A single month has no slope
+    assert tracker.spending_trends(num_months=1)[None]["slope"] == 0.0
+
+
+def test_spending_trends_without_data():
+    tracker = BudgetTracker()
+    trend = tracker.spending_trends([None, "food"])
+    assert trend["food"] == {"months": [], "totals": [], "rolling_average": [],
+                             "month_over_month": [], "total": 0.0, "slope": 0.0}
+
+
+def test_alerts_fire_once_per_threshold_crossed(capsys):
+    tracker = BudgetTracker()
+    alerts = []
+    tracker.add_alert_handler(alerts.append)
+    tracker.set_budget_limit("food", 100)
+    tracker.set_budget_limit("fun", 50)
+
+    # Under budget: no alert and no warning
+    tracker.add_transaction("2024-01", "food", 79.99, "expenses")
+    tracker.add_transaction("2024-01", "fun", 10, "expenses")
+    assert alerts == []
+    tracker._display_budget_warnings("2024-01")
+    assert "No budget limits exceeded." in capsys.readouterr().out
+
+    tracker.add_transaction("2024-01", "food", 0.01, "expenses")
+    tracker.add_transaction("2024-01", "fun", 60, "expenses")
+    tracker.add_transaction("2024-01", "food", 30, "expenses")
+    assert [(alert["category"], alert["threshold"]) for alert in alerts] == [
+        ("food", 80), ("fun", 80), ("fun", 100), ("fun", 120), ("food", 100)]
+    assert alerts[-1]["spent"] == 110 and alerts[-1]["limit"] == 100
+
+    # Listed in expense order, although fun went over first
+    tracker._display_budget_warnings("2024-01")
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1:3] == ["- food: $110.00 spent ($100.00 limit, 10.0% over)",
+                          "- fun: $70.00 spent ($50.00 limit, 40.0% over)"]
+
+    # Another month under budget raises nothing
+    alerts.clear()
+    tracker.add_transaction("2024-02", "food", 20, "expenses")
+    assert alerts == []
+    tracker._display_budget_warnings("2024-02")
+    assert "No budget limits exceeded." in capsys.readouterr().out
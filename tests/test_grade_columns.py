@@ -0,0 +1,13 @@
+from grade_book import Gradebook
+from grade_columns import ColumnarGrades
+
+
+def test_letter_grades_are_plain_strings():
+    book = Gradebook()
+    for name, grades in (("a", [95, 91]), ("b", [72]), ("c", [])):
+        book.add_student(name)
+        book.add_grades(name, grades)
+
+    letters = ColumnarGrades.from_gradebook(book).letter_grades()
+    assert letters == ["A", "C", "F"]
+    assert all(type(letter) is str for letter in letters)
@@ -0,0 +1,61 @@
+import os
+
+from gradebook_store import LOG_NAME, PersistentGradebook
+
+
+def test_grades_survive_restart(tmp_path):
+    with PersistentGradebook(tmp_path) as book:
+        book.add_student("a")
+        book.add_grades("a", [90, 80])
+
+    with PersistentGradebook(tmp_path) as book:
+        assert book.grades == {"a": [90, 80]}
+        assert book.average("a") == 85
+
+
+def test_compaction_inside_a_batch_does_not_replay_grades(tmp_path):
+    with PersistentGradebook(tmp_path, compact_every=3) as book:
+        book.add_student("a")
+        book.add_grades("a", [10, 20, 30, 40])
+
+    with PersistentGradebook(tmp_path, compact_every=3) as book:
+        assert book.grades == {"a": [10, 20, 30, 40]}
+
+
+def test_events_after_snapshot_are_replayed(tmp_path):
+    with PersistentGradebook(tmp_path) as book:
+        book.add_student("a")
+        book.add_grades("a", [70])
+        book.snapshot()
+        book.add_student("b")
+        book.add_grades("a", [90])
+
+    with PersistentGradebook(tmp_path) as book:
+        assert book.grades == {"a": [70, 90], "b": []}
+
+
+def test_torn_log_tail_is_dropped(tmp_path):
+    with PersistentGradebook(tmp_path) as book:
+        book.add_student("a")
+        book.add_grades("a", [70])
+    log_path = os.path.join(tmp_path, LOG_NAME)
+    with open(log_path, "ab") as log:
+        log.write(b'{"op":"grade","name":"a","gr')
+
+    with PersistentGradebook(tmp_path) as book:
+        assert book.grades == {"a": [70]}
+        book.add_grades("a", [80])
+
+    with PersistentGradebook(tmp_path) as book:
+        assert book.grades == {"a": [70, 80]}
+
+
+def test_names_with_nul_keep_their_grades(tmp_path):
+    with PersistentGradebook(tmp_path) as book:
+        for name, grade in (("a\0b", 70), ("c", 80), ("é", 90)):
+            book.add_student(name)
+            book.add_grades(name, [grade])
+        book.snapshot()
+
+    with PersistentGradebook(tmp_path) as book:
+        assert book.grades == {"a\0b": [70], "c": [80], "é": [90]}
@@ -0,0 +1,35 @@
+import asyncio
+
+from inventory_service import InventoryService
+from stock_ledger import StockLedger
+
+
+def test_failed_log_write_is_reported_and_retried(tmp_path):
+    ledger = StockLedger(tmp_path)
+    write_records = ledger.write_records
+
+    def failing_write(data):
+        raise OSError("disk full")
+
+    async def run():
+        service = InventoryService(ledger=ledger)
+        await service.handle({"op": "add_item", "name": "apple", "price": 0.5,
+                              "stock": 10, "category": "fruit"})
+        ledger.write_records = failing_write
+        reply = await service.handle({"op": "update_stock", "name": "apple",
+                                      "action": "r", "amount": 3})
+        assert reply["ok"] is False
+        assert reply["pending"] is True
+        assert "disk full" in reply["error"]
+
+        ledger.write_records = write_records
+        reply = await service.handle({"op": "update_stock", "name": "apple",
+                                      "action": "a", "amount": 1})
+        assert reply == {"ok": True, "stock": 8}
+        await service.close()
+
+    asyncio.run(run())
+
+    # The movement whose write failed was kept and saved with the next commit
+    with StockLedger(tmp_path) as reopened:
+        assert reopened.inventory["Apple"]["stock"] == 8
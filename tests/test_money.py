@@ -0,0 +1,18 @@
+from decimal import Decimal
+
+from arena.money import format_cents, to_cents
+
+
+def test_half_cent_floats_round_like_format():
+    # Every amount ends in a half cent, e.g. 12.345
+    for mills in range(5, 100_000_000, 99_730):
+        amount = (mills - mills % 10 + 5) / 1000
+        assert format_cents(to_cents(amount)) == f"${amount:,.2f}", amount
+    assert format_cents(to_cents(64775.075)) == "$64,775.07"
+
+
+def test_strings_and_decimals_convert_exactly():
+    assert to_cents("0.125") == 12
+    assert to_cents("0.135") == 14
+    assert to_cents(Decimal("-2.5")) == -250
+    assert to_cents(3) == 300
@@ -0,0 +1,15 @@
+from arena.pools import ordered_map
+
+
+def test_ordered_map_keeps_input_order():
+    items = range(-50, 50)
+    expected = [abs(item) for item in items]
+    assert list(ordered_map(abs, items, workers=1)) == expected
+    assert list(ordered_map(abs, iter(items), workers=3)) == expected
+
+
+def test_serial_map_runs_the_initializer():
+    calls = []
+    results = ordered_map(abs, [-1, 2], workers=1, initializer=calls.append, initargs=("ready",))
+    assert list(results) == [1, 2]
+    assert calls == ["ready"]
@@ -0,0 +1,42 @@
+import json
+import os
+
+from question_bank import QuestionBank
+
+
+def write_bank(path, categories):
+    with open(path, "w", encoding="utf-8") as bank:
+        for i, category in enumerate(categories):
+            bank.write(json.dumps({"category": category, "difficulty": "easy",
+                                   "question": f"{category} question {i}?",
+                                   "options": ["A", "B", "C", "D"], "answer": 0}) + "\n")
+
+
+def test_questions_by_category(tmp_path):
+    path = str(tmp_path / "bank.jsonl")
+    write_bank(path, ["Science", "History", "Science"])
+    with QuestionBank(path) as bank:
+        assert bank.count("Science", "easy") == 2
+        assert [q["question"] for q in bank.questions("History", "easy")] == ["History question 1?"]
+        assert len(bank.sample("Science", "easy", 5)) == 2
+
+
+def test_same_size_edit_rebuilds_index(tmp_path):
+    path = str(tmp_path / "bank.jsonl")
+    write_bank(path, ["Science", "History"])
+    QuestionBank(path).close()
+
+    write_bank(path, ["History", "Science"])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    with QuestionBank(path) as bank:
+        assert [q["category"] for q in bank.questions("Science", "easy")] == ["Science"]
+        assert bank.questions("Science", "easy")[0]["question"] == "Science question 1?"
+
+
+def test_empty_bank_has_no_questions(tmp_path):
+    path = tmp_path / "bank.jsonl"
+    path.write_bytes(b"")
+    with QuestionBank(str(path)) as bank:
+        assert bank.categories() == []
+        assert bank.sample("Science", "easy", 3) == []
@@ -0,0 +1,16 @@
+from quiz_analytics import QuizAnalytics
+
+
+def test_processes_add_to_one_stats_file(tmp_path):
+    path = str(tmp_path / "stats.json")
+    first, second = QuizAnalytics(), QuizAnalytics()
+    first.record("Science", "easy", "Q1", 2.0, True)
+    second.record("Science", "easy", "Q1", 4.0, False)
+    first.add_to(path)
+    second.add_to(path)
+    # Nothing new since the last add, so nothing is counted twice
+    first.add_to(path)
+
+    stats = QuizAnalytics.load(path).groups["question"]["Science/easy/Q1"]
+    assert (stats.attempts, stats.correct, stats.total_time) == (2, 1, 6.0)
+    assert stats.sketch.count == 2
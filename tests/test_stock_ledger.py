@@ -0,0 +1,50 @@
+import pytest
+
+from stock_ledger import StockLedger
+
+
+def test_movements_survive_restart(tmp_path):
+    with StockLedger(tmp_path) as ledger:
+        ledger.add_item("Apple", 0.5, 10, "Fruit")
+        assert ledger.submit([("sale", "Apple", 3), ("receipt", "Apple", 5)]) is None
+
+    with StockLedger(tmp_path) as ledger:
+        assert ledger.inventory["Apple"]["stock"] == 12
+        assert ledger.inventory.total_value_cents == 600
+
+
+def test_rejected_batch_is_not_logged(tmp_path):
+    with StockLedger(tmp_path) as ledger:
+        ledger.add_item("Apple", 0.5, 10, "Fruit")
+        assert ledger.submit([("sale", "Apple", 4), ("sale", "Apple", 7)])
+
+    with StockLedger(tmp_path) as ledger:
+        assert ledger.inventory["Apple"]["stock"] == 10
+
+
+def test_snapshot_then_replay(tmp_path):
+    with StockLedger(tmp_path, snapshot_every=2) as ledger:
+        ledger.add_item("Apple", 0.5, 10, "Fruit")
+        ledger.submit([("sale", "Apple", 1)])
+        ledger.submit([("sale", "Apple", 2)])
+
+    with StockLedger(tmp_path, snapshot_every=2) as ledger:
+        assert ledger.inventory["Apple"]["stock"] == 7
+
+
+def test_failed_group_write_neither_logs_nor_applies(tmp_path):
+    with StockLedger(tmp_path, group_size=2) as ledger:
+        ledger.add_item("Apple", 0.5, 10, "Fruit")
+        write = ledger._wal.write
+
+        def failing_write(data):
+            raise OSError("disk full")
+
+        ledger._wal.write = failing_write
+        with pytest.raises(OSError):
+            ledger.submit([("sale", "Apple", 3)])
+        ledger._wal.write = write
+        assert ledger.inventory["Apple"]["stock"] == 10
+
+    with StockLedger(tmp_path) as ledger:
+        assert ledger.inventory["Apple"]["stock"] == 10